@@ -4,44 +4,317 @@ Scrapes all comments from a list of Instagram posts using Playwright
 Includes username, comment text, likes, timestamp, and reply information
 """
 
-from playwright.sync_api import sync_playwright
-import time
+from playwright.async_api import async_playwright
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import functools
 import json
+import logging
 from datetime import datetime
 import re
+import os
+import shutil
+import sys
+import time
+
+try:
+    import orjson
+except ImportError:  # Optional: falls back to compact stdlib json
+    orjson = None
+
+
+# Per-post details go to DEBUG; only post boundaries and summaries are printed
+logger = logging.getLogger(__name__)
+
+# Placeholder for fields that could not be read, shared by every record
+_NA = sys.intern('N/A')
+
+def _json_line(record):
+    """Serialize one record as a compact NDJSON line (UTF-8 bytes)"""
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+_NUM_RE = re.compile(r'([\d,.]+)\s*([KMkm]?)\b')
+_MULTIPLIERS = {'': 1, 'K': 1000, 'k': 1000, 'M': 1000000, 'm': 1000000}
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_count(text):
+    """Parse a count like '1,234' or '1.2K'; the same few strings recur, so results are cached"""
+    match = _NUM_RE.match(text.strip())
+    if not match:
+        return 0
+    try:
+        number = float(match.group(1).replace(',', ''))
+    except ValueError:
+        return 0
+    return int(number * _MULTIPLIERS[match.group(2)])
+
+
+# Page-side helpers, registered once per context with add_init_script so every
+# evaluate call only ships a short call expression instead of the whole body
+_PAGE_HELPERS_JS = '''
+window.__findCommentWindow = () => {
+    const main = document.getElementsByTagName('main')[0];
+    if (!main) return null;
+    for (const el of main.getElementsByTagName('div')) {
+        if (el.scrollHeight > el.clientHeight) {
+            const overflow = getComputedStyle(el).overflowY;
+            if (overflow === 'auto' || overflow === 'scroll') return el;
+        }
+    }
+    return null;
+};
+
+window.__scrollToEnd = (el, maxAttempts, itemSelector) => new Promise(resolve => {
+    // Stable once neither the comment count nor the scroll height grows for 3 ticks
+    let lastCount = -1, lastHeight = -1, stable = 0, attempts = 0;
+    const tick = () => {
+        el.scrollTop = el.scrollHeight;
+        attempts++;
+        const count = document.querySelectorAll(itemSelector).length;
+        if (count === lastCount && el.scrollHeight === lastHeight) {
+            stable++;
+        } else {
+            stable = 0;
+            lastCount = count;
+            lastHeight = el.scrollHeight;
+        }
+        if (stable >= 3 || attempts >= maxAttempts) {
+            return resolve({attempts, count, done: stable >= 3});
+        }
+        setTimeout(tick, 300);
+    };
+    tick();
+});
+
+window.__clickButton = (labels) => {
+    for (const button of document.querySelectorAll('button, [role="button"]')) {
+        const text = button.textContent.trim();
+        if (labels.includes(text)) {
+            button.click();
+            return text;
+        }
+    }
+    return null;
+};
+
+window.__loginOutcome = (errors) => {
+    // null keeps wait_for_function polling; any object settles it
+    if (location.href.includes('checkpoint') || location.pathname.startsWith('/challenge')) {
+        return {ok: false, why: location.pathname};
+    }
+    const body = document.body ? document.body.innerText.toLowerCase() : '';
+    for (const error of errors) {
+        if (body.includes(error.toLowerCase())) return {ok: false, why: error};
+    }
+    if (document.querySelector('svg[aria-label="Home"]') || !location.pathname.startsWith('/accounts/login')) {
+        return {ok: true};
+    }
+    return null;
+};
+
+window.__extractPost = (sel) => {
+    // Comment bodies go through innerText so <br> line breaks survive; names and
+    // counts are single-line, so plain textContent is enough for them
+    const firstText = (node, selectors, rendered = false) => {
+        for (const selector of selectors) {
+            const el = node.querySelector(selector);
+            const text = el ? (rendered ? el.innerText : el.textContent).trim() : '';
+            if (text) return text;
+        }
+        return 'N/A';
+    };
+
+    // The commenter's avatar/name link (/<username>/) survives layout shuffles that
+    // break positional selectors, so read the name from its href first
+    const profileName = (node) => {
+        const link = node.querySelector(sel.commentProfileLink);
+        const match = link && /^\\/([A-Za-z0-9._]+)\\/?$/.exec(link.getAttribute('href'));
+        return match ? match[1] : null;
+    };
+
+    const comments = [];
+    document.querySelectorAll(sel.comments).forEach((comment, i) => {
+        comments.push({
+            index: i + 1,
+            username: profileName(comment) || firstText(comment, sel.commentUsername),
+            text: firstText(comment, sel.commentText, true),
+        });
+    });
+
+    const hearts = document.querySelector(sel.hearts);
+    return JSON.stringify({
+        author: firstText(document, sel.author),
+        likesCount: document.querySelectorAll(sel.likes).length,
+        hearts: hearts ? hearts.textContent : '',
+        comments,
+    });
+};
+'''
 
 
 class InstagramCommentsScraper:
-    def __init__(self, username, password):
+    # Selectors are constant across posts, build them once. They are CSS anchored on
+    # <section><main> rather than absolute XPath, so Blink can match them right-to-left
+    _POST_BODY = 'section > main > div > div:nth-of-type(1) > div > div:nth-of-type(2) > div > div:nth-of-type(2)'
+    _COMMENTS_SELECTOR = f'{_POST_BODY} > div > div > div'
+    _LIKES_SELECTOR = f'{_POST_BODY} > div > div:nth-of-type(2) > div > div > div > div > div > div > div:nth-of-type(1) > span > span'
+    _HEARTS_SELECTOR = 'div > div > div > section > div:nth-of-type(1) > span:nth-of-type(2)'
+    _AUTHOR_SELECTORS = (
+        'div > div > div:nth-of-type(1) > div > span > div > span > div > a',  # Collaborator detection path
+        'div > div > span > span > span > div > a > div > div > span',  # Single posting username detection path
+    )
+    # Relative to a single comment element; the profile link is tried before the positional fallback
+    _COMMENT_PROFILE_LINK_SELECTOR = ':scope a[href^="/"]'
+    _COMMENT_USERNAME_SELECTORS = (':scope div:nth-of-type(1) > span:nth-of-type(1) > span',)
+    _COMMENT_TEXT_SELECTORS = (':scope div > div:nth-of-type(2) > span', ':scope div > span > div > span')
+    # Everything window.__extractPost reads, shipped as one argument
+    _EXTRACT_SELECTORS = {
+        'comments': _COMMENTS_SELECTOR,
+        'commentProfileLink': _COMMENT_PROFILE_LINK_SELECTOR,
+        'commentUsername': _COMMENT_USERNAME_SELECTORS,
+        'commentText': _COMMENT_TEXT_SELECTORS,
+        'author': _AUTHOR_SELECTORS,
+        'likes': _LIKES_SELECTOR,
+        'hearts': _HEARTS_SELECTOR,
+    }
+
+    # Dialog buttons are clicked in-page by label; login errors are probed with one joined selector
+    _COOKIE_LABELS = ('Allow all cookies', 'Allow All', 'Accept')
+    # "Save login info" and the notifications prompt, which can follow each other
+    _POST_LOGIN_LABELS = ('Not now', 'Not Now', 'Save Info', 'Turn Off')
+    _LOGIN_ERRORS = (
+        'Sorry, your password was incorrect.',
+        'checkpoint',
+        'Challenge Required',
+        'Suspicious Login Attempt',
+        'Try again',
+        'Enter security code',
+        'Please try again later',
+        'Too many requests',
+    )
+
+    _LOGIN_FORM_SELECTOR = 'input[name="email"], input[name="pass"]'
+
+    # Page texts Instagram shows when it starts throttling the account
+    _RATE_LIMIT_SELECTOR = ', '.join(f':text("{text}")' for text in (
+        'Please try again later',
+        'Try again later',
+        'Please wait a few minutes',
+        'Too many requests',
+    ))
+    _MAX_BACKOFF = 60.0
+
+    # Hard cap in seconds on the in-page scroll loop for one post
+    _SCROLL_TIMEOUT = 60
+
+    # Posts a worker page handles before it is replaced by a fresh one
+    PAGE_RECYCLE_EVERY = 25
+
+    # Saved sessions older than this are not trusted and trigger a fresh login
+    SESSION_MAX_AGE = 12 * 60 * 60
+
+    # Posts scraped at the same time, each on its own page of the logged-in context
+    MAX_PARALLEL_PAGES = 3
+
+    # Comment bodies, commenter links and the heart count are all markup; avatars, the post's
+    # own photo or video and fonts are never looked at. Stylesheets stay enabled: scroll
+    # container detection and lazy loading rely on layout.
+    _BLOCKED_RESOURCE_TYPES = frozenset({'image', 'media', 'font'})
+    # Telemetry beacons fire on every navigation and scroll and carry nothing we read
+    _BLOCKED_URL_PARTS = ('/ajax/bz', '/logging_client_events', '/log/')
+    # A narrow, tall window: less to lay out, and the comment list still gets room to render
+    _VIEWPORT = {'width': 800, 'height': 1200}
+
+    def __init__(self, username, password, session_file='session.json', headless=True, block_resources=True):
         self.username = username
         self.password = password
+        self.session_file = session_file
+        self.headless = headless
+        self.block_resources = block_resources
         self.playwright = None
         self.browser = None
+        self.context = None
         self.page = None
+        # Shared by all workers: Instagram throttles the account, not a single page
+        self._backoff = 0.0
+        self._session_loaded = False
+
+    async def start(self):
+        """Initialize Playwright and browser (reusing saved session cookies if present)"""
+        self.playwright = await async_playwright().start()
+        self.browser = await self.playwright.chromium.launch(
+            headless=self.headless,
+            args=['--disable-blink-features=AutomationControlled']
+        )
+        self._session_loaded = self._has_fresh_session()
+        if self._session_loaded:
+            print(f"✓ Reusing saved session from {self.session_file}")
+            self.context = await self.browser.new_context(viewport=self._VIEWPORT, storage_state=self.session_file)
+        else:
+            self.context = await self.browser.new_context(viewport=self._VIEWPORT)
+        # English UI keeps the label/error text matching valid
+        await self.context.set_extra_http_headers({'Accept-Language': 'en-US,en;q=0.9'})
+        await self.context.add_init_script(script=_PAGE_HELPERS_JS)
+        self.page = await self.context.new_page()
+
+    def _has_fresh_session(self):
+        """Check for a saved session file young enough to reuse"""
+        if not self.session_file or not os.path.exists(self.session_file):
+            return False
+        age = time.time() - os.path.getmtime(self.session_file)
+        if age > self.SESSION_MAX_AGE:
+            print(f"⚠️ Saved session is {age / 3600:.0f}h old, logging in again")
+            return False
+        return True
 
-    def start(self):
-        """Initialize Playwright and browser"""
-        self.playwright = sync_playwright().start()
-        self.browser = self.playwright.chromium.launch(headless=False)
-        self.page = self.browser.new_context().new_page()
-
-    def _is_login_page(self):
-        """Detect if we're on Instagram login page"""
+    async def _route_request(self, route):
+        """Abort requests for resources the comment scraper never reads"""
+        request = route.request
+        if request.resource_type in self._BLOCKED_RESOURCE_TYPES or any(
+            part in request.url for part in self._BLOCKED_URL_PARTS
+        ):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _enable_resource_blocking(self, context=None):
+        """Start blocking heavy resources (kept off during login so the form renders normally)"""
+        if self.block_resources:
+            await (context or self.context).route('**/*', self._route_request)
+
+    async def _is_logged_in(self):
+        """Check whether the current session is already authenticated"""
         try:
-            login_indicators = [
-                'input[name="email"]',
-                'input[name="pass"]',
-            ]
-            for indicator in login_indicators:
-                if self.page.query_selector(indicator):
-                    print(f"✓ Login page detected (found: {indicator})")
-                    return True
+            await self.page.goto('https://www.instagram.com/', timeout=60000, wait_until='domcontentloaded')
+            await self.page.wait_for_selector('svg[aria-label="Home"], input[name="email"]', timeout=10000)
+            return await self.page.query_selector('svg[aria-label="Home"]') is not None
+        except Exception as e:
+            print(f"Could not verify existing session: {e}")
             return False
+
+    async def _save_session(self):
+        """Persist cookies/localStorage so the next run can skip login"""
+        if not self.session_file:
+            return
+        try:
+            await self.context.storage_state(path=self.session_file)
+            print(f"✓ Session saved to {self.session_file}")
         except Exception as e:
-            print(f"Error detecting login page: {e}")
+            print(f"⚠️ Could not save session: {e}")
+
+    async def _wait_for_login_page(self, timeout=10000):
+        """Wait for either login form field with one joined selector"""
+        try:
+            await self.page.wait_for_selector(self._LOGIN_FORM_SELECTOR, timeout=timeout)
+            return True
+        except Exception:
             return False
 
-    def _click_login_button(self, timeout=10000):
+    async def _click_login_button(self, timeout=10000):
         """Try multiple XPath selectors to click the login button"""
         button_selectors = [
             "xpath=//*[@id='login_form']/div/div[1]/div/div[3]/div/div/div",
@@ -50,26 +323,25 @@ class InstagramCommentsScraper:
         for selector in button_selectors:
             try:
                 print(f"Attempting: {selector}")
-                element = self.page.query_selector(selector)
+                element = await self.page.query_selector(selector)
                 if element:
-                    self.page.click(selector, timeout=timeout)
+                    await self.page.click(selector, timeout=timeout)
                     print(f"✓ Clicked login button with: {selector}")
-                    # Handle: check for incorrect page after click
-                    time.sleep(2)
-                    error_indicators = [
-                        'text=Sorry, your password was incorrect.',
-                        'text=checkpoint',
-                        'text=Challenge Required',
-                        'text=Suspicious Login Attempt',
-                        'text=Try again',
-                        'text=Enter security code',
-                        'text=Please try again later',
-                        'text=Too many requests',
-                    ]
-                    for err_sel in error_indicators:
-                        if self.page.query_selector(err_sel):
-                            print(f"⚠️ Detected error or checkpoint after login: {err_sel}")
-                            return False
+                    # One in-page poll settles on whichever comes first: an error text,
+                    # the home icon, or leaving the login URL
+                    try:
+                        handle = await self.page.wait_for_function(
+                            '(errors) => window.__loginOutcome(errors)',
+                            arg=list(self._LOGIN_ERRORS), polling=200, timeout=15000
+                        )
+                        outcome = await handle.json_value()
+                    except Exception:
+                        # No error shown either; carry on as before and let later steps decide
+                        print("⚠️ Login outcome unclear after 15s, continuing")
+                        outcome = {'ok': True}
+                    if not outcome['ok']:
+                        print(f"⚠️ Detected error or checkpoint after login: {outcome['why'][:80]}")
+                        return False
                     return True
             except Exception as e:
                 print(f"✗ Failed with {selector}: {str(e)[:60]}")
@@ -78,162 +350,123 @@ class InstagramCommentsScraper:
         print("⚠️ Could not find login button")
         return False
 
-    def login(self):
+    async def _dismiss_any(self, labels, budget_ms=2000, max_clicks=1):
+        """Click dialog buttons with any of the labels as they show up, within one shared time budget"""
+        clicked = []
+        deadline = time.monotonic() + budget_ms / 1000
+        while len(clicked) < max_clicks:
+            remaining = int((deadline - time.monotonic()) * 1000)
+            if remaining <= 0:
+                break
+            try:
+                # __clickButton clicks as soon as a match renders and returns its label
+                handle = await self.page.wait_for_function(
+                    '(labels) => window.__clickButton(labels)',
+                    arg=list(labels), polling=100, timeout=remaining
+                )
+            except Exception:
+                break  # Nothing (more) to dismiss within the budget
+            clicked.append(await handle.json_value())
+        return clicked
+
+    async def login(self):
         """Login to Instagram with credentials"""
+        if self._session_loaded and await self._is_logged_in():
+            print("✓ Already logged in with saved session, skipping login flow")
+            await self._enable_resource_blocking()
+            return True
+
         print("Navigating to Instagram login...")
         try:
-            self.page.goto('https://www.instagram.com/accounts/login/', timeout=60000, wait_until='domcontentloaded')
-            time.sleep(2)
+            await self.page.goto('https://www.instagram.com/accounts/login/', timeout=60000, wait_until='domcontentloaded')
         except Exception as e:
             print(f"Error navigating to login page: {e}")
             return False
 
         # Wait and verify we're on login page
-        max_wait = 10
-        for i in range(max_wait):
-            if self._is_login_page():
-                print("✓ Successfully loaded login page")
-                break
-            if i < max_wait - 1:
-                print(f"⏳ Waiting for login page... ({i+1}/{max_wait})")
-                time.sleep(1)
-            else:
-                print("⚠️ Login page did not load within timeout")
-
-        time.sleep(1)
+        if await self._wait_for_login_page():
+            print("✓ Successfully loaded login page")
+        else:
+            print("⚠️ Login page did not load within timeout")
 
         # Accept cookies
-        try:
-            cookie_buttons = [
-                'button:has-text("Allow all cookies")',
-                'button:has-text("Allow All")',
-                'button:has-text("Accept")',
-            ]
-            for btn_selector in cookie_buttons:
-                try:
-                    self.page.click(btn_selector, timeout=3000)
-                    print("✓ Cookies accepted")
-                    break
-                except:
-                    continue
-        except Exception as e:
-            print(f"⚠️ Cookie dialog skipped: {e}")
-
-        time.sleep(1)
+        if await self._dismiss_any(self._COOKIE_LABELS, budget_ms=1000):
+            print("✓ Cookies accepted")
 
         # Fill in credentials
         try:
-            self.page.fill('input[name="email"]', self.username, timeout=5000)
+            await self.page.fill('input[name="email"]', self.username, timeout=5000)
             print(f"✓ Username filled")
         except Exception as e:
             print(f"Error filling username: {e}")
 
-        time.sleep(0.5)
-
         try:
-            self.page.fill('input[name="pass"]', self.password, timeout=5000)
+            await self.page.fill('input[name="pass"]', self.password, timeout=5000)
             print(f"✓ Password filled")
         except Exception as e:
             print(f"Error filling password: {e}")
 
-        time.sleep(1)
-
         # Click login button
-        is_login_success = self._click_login_button()
+        is_login_success = await self._click_login_button()
         if not is_login_success:
             print("⚠️ Login button click failed, aborting login flow")
             return False
-        time.sleep(5)
 
-        # Dismiss dialogs
-        try:
-            save_buttons = [
-                'button:has-text("Not now")',
-                'button:has-text("Not Now")',
-                'button:has-text("Save Info")',
-            ]
-            for btn in save_buttons:
-                try:
-                    self.page.click(btn, timeout=3000)
-                    print("✓ 'Save login info' dismissed")
-                    break
-                except:
-                    continue
-        except:
-            pass
+        # Save-info and notification prompts share one 3s budget
+        for label in await self._dismiss_any(self._POST_LOGIN_LABELS, budget_ms=3000, max_clicks=2):
+            print(f"✓ Dismissed dialog with '{label}'")
 
-        time.sleep(1)
+        print("✓ Login flow completed")
+        await self._save_session()
+        await self._enable_resource_blocking()
+        return True
 
+    async def _find_comment_window(self, page, timeout=5000):
+        """Wait for the scrollable comment container and return it (no absolute XPath walk)"""
         try:
-            notif_buttons = [
-                'button:has-text("Not Now")',
-                'button:has-text("Not now")',
-                'button:has-text("Turn Off")',
-            ]
-            for btn in notif_buttons:
-                try:
-                    self.page.click(btn, timeout=3000)
-                    print("✓ Notifications prompt dismissed")
-                    break
-                except:
-                    continue
-        except:
-            pass
+            handle = await page.wait_for_function('window.__findCommentWindow()', timeout=timeout)
+        except Exception:
+            return None
+        return handle.as_element()
 
-        print("✓ Login flow completed")
-        return True
+    async def _scroll_comments_to_end(self, page, comment_window, max_attempts=60):
+        """Scroll comment window until all comments are loaded (single in-page loop)"""
+        try:
+            result = await asyncio.wait_for(page.evaluate(
+                '([el, maxAttempts, itemSelector]) => window.__scrollToEnd(el, maxAttempts, itemSelector)',
+                [comment_window, max_attempts, self._COMMENTS_SELECTOR]
+            ), timeout=self._SCROLL_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️ Comment scrolling still running after {self._SCROLL_TIMEOUT}s, moving on")
+            return False
 
-    def _scroll_comments_to_end(self, comment_window):
-        """Scroll comment window until all comments are loaded"""
-        prev_scroll = -1
-        max_attempts = 30
-        
-        for i in range(max_attempts):
-            self.page.evaluate('el => el.scrollTop = el.scrollHeight', comment_window)
-            time.sleep(1)
-            curr_scroll = self.page.evaluate('el => el.scrollTop', comment_window)
-            
-            if curr_scroll == prev_scroll:
-                print(f"✓ Scrolled to bottom of comments after {i+1} attempts")
-                return True
-            prev_scroll = curr_scroll
-        
-        print(f"⚠️ Reached max scroll attempts ({max_attempts}) for comments")
+        if result['done']:
+            logger.debug(f"✓ Scrolled to bottom of comments after {result['attempts']} attempts ({result['count']} comments)")
+            return True
+
+        logger.warning(f"⚠️ Reached max scroll attempts ({max_attempts}) for comments")
         return False
 
     def _parse_number(self, text):
         """Parse number from text (handles K, M suffixes)"""
-        try:
-            text = text.strip().split()[0]
-            multiplier = 1
-
-            if 'K' in text.upper():
-                multiplier = 1000
-                text = text.upper().replace('K', '')
-            elif 'M' in text.upper():
-                multiplier = 1000000
-                text = text.upper().replace('M', '')
-
-            number = float(text.replace(',', ''))
-            return int(number * multiplier)
-        except:
+        if not isinstance(text, str):
             return 0
+        return _parse_count(text)
+
+    async def _open_post(self, page, post_url):
+        """Open a post on an already warm page (cookies, cache and app bundle stay loaded)"""
+        await page.goto(post_url, timeout=60000, wait_until='domcontentloaded')
+        await page.wait_for_selector('main', timeout=15000)
 
-    def scrape_post_comments(self, post_url):
+    async def scrape_post_comments(self, post_url, page=None):
         """Scrape all comments from a single Instagram post"""
+        page = page or self.page
         print(f"\n{'='*70}")
         print(f"Scraping comments from: {post_url}")
         print(f"{'='*70}")
         
-        try:
-            self.page.goto(post_url, timeout=60000, wait_until='domcontentloaded')
-            time.sleep(3)
-        except Exception as e:
-            print(f"Error loading post: {e}")
-            return []
-
         comments_data = {
-            'username': 'N/A',
+            'username': _NA,
             'url': post_url,
             'likes':0,
             'hearts':0,
@@ -241,156 +474,254 @@ class InstagramCommentsScraper:
             'comments_details': []
         }
 
-        comments_detail = []
+        try:
+            await self._open_post(page, post_url)
+        except Exception as e:
+            logger.warning(f"Error loading post: {e}")
+            comments_data['error'] = str(e)[:200]
+            return comments_data
 
         try:
             # Find and scroll the comment window
-            comment_window = self.page.query_selector('xpath=//*/div/div/div[2]/div/div/div[1]/div[1]/div[2]/section/main/div/div[1]/div/div[2]/div/div[2]')
+            comment_window = await self._find_comment_window(page)
             
             if comment_window:
-                print("✓ Comment window found, scrolling to load all comments...")
-                self._scroll_comments_to_end(comment_window)
+                # Count only once the first comment is rendered, not whatever is there right now
+                comments = page.locator(self._COMMENTS_SELECTOR)
+                try:
+                    await comments.first.wait_for(state='attached', timeout=5000)
+                except Exception:
+                    pass
+                # Sparse posts have nothing left to lazy-load; skip the scroll loop for them
+                initial_count = await comments.count()
+                if initial_count < 5:
+                    logger.debug(f"✓ Only {initial_count} comments on the post, skipping scroll")
+                else:
+                    logger.debug("✓ Comment window found, scrolling to load all comments...")
+                    # The first batch says nothing about how many are left to load; the
+                    # stable-count check and _SCROLL_TIMEOUT end the loop, not this count
+                    await self._scroll_comments_to_end(page, comment_window)
             else:
-                print("⚠️ Comment window not found, attempting to scroll main page")
-                self.page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-                time.sleep(2)
-
-            # Extract all comments
-            comments_xpath = '//*/div/div/div[2]/div/div/div[1]/div[1]/div[2]/section/main/div/div[1]/div/div[2]/div/div[2]/div/div/div'
-            comment_elements = self.page.locator(comments_xpath).all()
-            print(f"Found {len(comment_elements)} comment elements")
-            comments_data['comments'] = len(comment_elements)
-           
-             # Extract Username
-            username_selectors = [
-                'xpath=//div/div/div[1]/div/span/div/span/div/a',  # Collaborator detection path
-                'xpath=//div/div/span/span/span/div/a/div/div/span',  # Single posting username detection path
-            ]
-            
-            for selector in username_selectors:
+                logger.warning("⚠️ Comment window not found, attempting to scroll main page")
+                await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
                 try:
-                    username_elem = self.page.locator(selector).first
-                    username_text = username_elem.inner_text(timeout=3000)  # Shorter 3s timeout
-                    if username_text and username_text.strip():
-                        print(f"✓ Extracted username for comment: {username_text}")
-                        comments_data['username'] = username_text.strip()
-
-                        break
-                except Exception as selector_err:
-                    print(f"✗ Failed to extract username for comment  with {selector}: {str(selector_err)[:60]}")
-                    continue
-
-            #extract likes 
-            likes_xpath = '//*/div/div/div[2]/div/div/div[1]/div[1]/div[2]/section/main/div/div[1]/div/div[2]/div/div[2]/div/div[2]/div/div/div/div/div/div/div[1]/span/span'
-            likes_elements = self.page.locator(likes_xpath).all()   
-            print(f"Found {len(likes_elements)} likes elements")
-            comments_data['likes'] = len(likes_elements)
-
-            #extract heart
-            try:
-                heart_likes = self.page.locator('xpath=//div/div/div/section/div[1]/span[2]').inner_text()
-                comments_data['hearts'] = self._parse_number(heart_likes)
-            except:
-                pass
-            print(f"✓ Extracted hearts: {comments_data['hearts']}")
+                    await page.wait_for_load_state('networkidle', timeout=2000)
+                except Exception:
+                    pass
+
+            # Author, likes, hearts and every comment come back from one evaluate
+            post = await self._extract_post(page)
+            if post is None:
+                return comments_data
+
+            comments_data['comments_details'] = post['comments']
+            comments_data['comments'] = len(post['comments'])
+            logger.debug(f"Found {comments_data['comments']} comment elements")
+            if post['author'] != _NA:
+                comments_data['username'] = post['author']
+                logger.debug(f"✓ Extracted post username: {post['author']}")
+            else:
+                logger.warning("✗ Failed to extract post username")
+            comments_data['likes'] = post['likesCount']
+            logger.debug(f"Found {post['likesCount']} likes elements")
+            comments_data['hearts'] = self._parse_number(post['hearts'])
+            logger.debug(f"✓ Extracted hearts: {comments_data['hearts']}")
 
-            for idx, comment_elem in enumerate(comment_elements, 1):
-                try:
-                    comment_info = self._extract_comment_data(comment_elem, idx)
-                    if comment_info:
-                        comments_detail.append(comment_info)
-                except Exception as e:
-                    print(f"Error extracting comment {idx}: {e}")
-                    continue
-
-            comments_data['comments_details'] = comments_detail
-            print(f"\n✓ Successfully extracted {len(comments_detail)} comments")
+            print(f"\n✓ Successfully extracted {len(comments_data['comments_details'])} comments")
             return comments_data
 
         except Exception as e:
-            print(f"Error scraping post comments: {e}")
+            logger.warning(f"Error scraping post comments: {e}")
             return comments_data
 
-    def _extract_comment_data(self, comment_elem, idx):
-        """Extract data from a single comment element"""
-        try:
-            comment_data = {
-                'index': idx,
-                'username': 'N/A',
-                'text': 'N/A',
-            }
-
-            # Extract Username
-            username_selectors = [
-                'xpath=.//div[1]/span[1]/span',  # Relative xpath to link
-            ]
-            
-            for selector in username_selectors:
-                try:
-                    username_elem = comment_elem.locator(selector).first
-                    username_text = username_elem.inner_text(timeout=3000)  # Shorter 3s timeout
-                    if username_text and username_text.strip():
-                        print(f"✓ Extracted username for comment {idx}: {username_text}")
-                        comment_data['username'] = username_text.strip()
-
-                        break
-                except Exception as selector_err:
-                    print(f"✗ Failed to extract username for comment {idx} with {selector}: {str(selector_err)[:60]}")
-                    continue
-            
-            # Extract Comment Text
-            text_selectors = [
-                'xpath=.//div/div[2]/span',  # Relative xpath to comment text
-                'xpath=.//div/span/div/span',  # Alternative path for text
-            ]
-            
-            for selector in text_selectors:
-                try:
-                    text_elem = comment_elem.locator(selector).first
-                    text_content = text_elem.inner_text(timeout=3000)
-                    if text_content and text_content.strip():
-                        print(f"✓ Extracted comment text for comment {idx}: {text_content[:100]}...")
-                        comment_data['text'] = text_content.strip()
-                        break
-                except Exception as selector_err:
-                    print(f"✗ Failed to extract comment text for comment {idx} with {selector}: {str(selector_err)[:60]}")
-                    continue
-
-            return comment_data
+    async def _extract_post(self, page):
+        """Extract post author, counts and every comment in a single page.evaluate call
 
+        Comment bodies use innerText to keep their line breaks; nothing mutates the
+        DOM during the call, so that costs one layout pass rather than one per comment.
+        Names and counts read textContent straight from the markup.
+        """
+        try:
+            raw = await page.evaluate('(sel) => window.__extractPost(sel)', self._EXTRACT_SELECTORS)
+            # One string payload decoded by the C json parser instead of a
+            # structured value that Playwright unpacks field by field
+            post = json.loads(raw)
         except Exception as e:
-            print(f"Error extracting comment data: {e}")
+            logger.warning(f"Error extracting comments: {e}")
             return None
 
-    def scrape_posts_comments(self, post_urls):
-        """Scrape comments from multiple posts"""
-        # all_comments = {}
-        results = []
-        for idx, post_url in enumerate(post_urls, 1):
-            print(f"\n[{idx}/{len(post_urls)}] Processing post...")
-            
-            # Ensure URL is complete
-            if not post_url.startswith('http'):
-                post_url = f"https://www.instagram.com{post_url}"
-
-            comments = self.scrape_post_comments(post_url)
-            # all_comments[post_url] = comments
-            results.append(comments)
-            time.sleep(2)  # Delay between posts
+        # Usernames repeat a lot across comments; share one string object per name
+        for comment in post['comments']:
+            username = comment['username']
+            if len(username) < 40:
+                comment['username'] = sys.intern(username)
+            if comment['text'] == _NA:
+                comment['text'] = _NA
+        return post
+
+    async def _throttle(self, page):
+        """Back off exponentially while Instagram rate-limits us, otherwise carry on right away"""
+        try:
+            limited = await page.query_selector(self._RATE_LIMIT_SELECTOR) is not None
+        except Exception:
+            limited = False
+
+        if limited:
+            self._backoff = min(self._MAX_BACKOFF, self._backoff * 2 or 2.0)
+            print(f"⚠️ Rate limited by Instagram, waiting {self._backoff:.0f}s")
+            await asyncio.sleep(self._backoff)
+        else:
+            self._backoff *= 0.5
+
+    async def _scrape_posts_worker(self, queue, total, results, out_file=None):
+        """Scrape queued posts one after another on a single long-lived page"""
+        # Keeping the page open between posts lets later posts reuse the running app.
+        # Pages share the logged-in context, so cookies, routes and init scripts apply to all.
+        # The page is swapped for a fresh one every few posts or after a failed load,
+        # which drops the JS heap the app accumulates without logging in again.
+        page = None
+        posts_on_page = 0
+        try:
+            while True:
+                try:
+                    idx, post_url = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if page is None:
+                    page = await self.context.new_page()
+                    posts_on_page = 0
+                print(f"\n[{idx}/{total}] Processing post...")
+                post = await self.scrape_post_comments(post_url, page)
+                posts_on_page += 1
+                if out_file is not None:
+                    # Write the post out right away and only keep its summary in memory
+                    out_file.write(_json_line(post))
+                    out_file.flush()
+                    post = {k: v for k, v in post.items() if k != 'comments_details'}
+                results[idx - 1] = post
+                await self._throttle(page)
+                if posts_on_page >= self.PAGE_RECYCLE_EVERY or 'error' in post:
+                    await page.close()
+                    page = None
+        except Exception as e:
+            print(f"Worker failed: {e}")
+        finally:
+            if page:
+                await page.close()
+
+    async def scrape_posts_comments(self, post_urls, max_concurrency=None, out_file=None):
+        """Scrape comments from multiple posts concurrently
+
+        When out_file (opened in binary mode) is given, every post is written to it as
+        one JSON line as soon as it is scraped, and the returned summaries leave out
+        comments_details.
+        """
+        # Ensure URLs are complete
+        post_urls = [u if u.startswith('http') else f"https://www.instagram.com{u}" for u in post_urls]
+        if not post_urls:
+            return []
 
-        return results
+        queue = asyncio.Queue()
+        for job in enumerate(post_urls, 1):
+            queue.put_nowait(job)
+
+        results = [None] * len(post_urls)
+        workers = min(max_concurrency or self.MAX_PARALLEL_PAGES, len(post_urls))
+        await asyncio.gather(*[
+            self._scrape_posts_worker(queue, len(post_urls), results, out_file)
+            for _ in range(workers)
+        ])
+        return [r for r in results if r is not None]
+
+    @classmethod
+    def scrape_posts_parallel(cls, accounts, post_urls, out_path, workers=4):
+        """Scrape posts across processes, each with its own browser, account and saved session
+
+        accounts is a list of (username, password, session_file) tuples, one per worker,
+        so every process logs in (if it has to) with the credentials its session belongs to.
+        Every process streams to its own NDJSON shard next to out_path; the shards are
+        appended to out_path afterwards. Returns the per-post summaries.
+        """
+        if not accounts:
+            raise ValueError("scrape_posts_parallel needs at least one (username, password, session_file) account")
+        if not post_urls:
+            raise ValueError("scrape_posts_parallel needs at least one post URL")
+
+        workers = max(1, min(workers, len(accounts), len(post_urls)))
+        shards = [f"{out_path}.part{i}" for i in range(workers)]
+        jobs = [
+            (cls, *accounts[i], post_urls[i::workers], shards[i])
+            for i in range(workers)
+        ]
 
-    def close(self):
+        summaries = []
+        try:
+            with ProcessPoolExecutor(workers) as executor:
+                futures = [executor.submit(_scrape_shard, job) for job in jobs]
+                # A worker that crashes loses only its own slice, not everyone's summaries
+                for i, future in enumerate(futures):
+                    try:
+                        summaries.extend(future.result())
+                    except Exception as e:
+                        print(f"⚠️ Worker {i} ({accounts[i][2]}) failed: {e}")
+        finally:
+            # Whatever the workers managed to stream is kept, and no .partN files are left behind
+            with open(out_path, 'ab') as out:
+                for shard in shards:
+                    if os.path.exists(shard):
+                        with open(shard, 'rb') as f:
+                            shutil.copyfileobj(f, out)
+                        os.remove(shard)
+        return summaries
+
+    async def close(self):
         """Close browser and playwright"""
         if self.browser:
-            self.browser.close()
+            await self.browser.close()
         if self.playwright:
-            self.playwright.stop()
+            await self.playwright.stop()
         print("Browser closed")
 
 
+def _scrape_shard(job):
+    """Process pool entry point: scrape one slice of the posts into its own shard file"""
+    scraper_cls, username, password, session_file, post_urls, shard_path = job
+
+    async def _run():
+        scraper = scraper_cls(username, password, session_file=session_file)
+        try:
+            await scraper.start()
+            if not await scraper.login():
+                print(f"Login failed for {session_file}, skipping {len(post_urls)} posts")
+                return []
+            with open(shard_path, 'wb') as f:
+                return await scraper.scrape_posts_comments(post_urls, out_file=f)
+        finally:
+            await scraper.close()
+
+    return asyncio.run(_run())
+
+
+def scrape_comments(username, password, post_urls, **kwargs):
+    """Synchronous entry point: start, login, scrape all posts and close in one call"""
+    async def _run():
+        scraper = InstagramCommentsScraper(username, password)
+        try:
+            await scraper.start()
+            if not await scraper.login():
+                print("Login failed, exiting...")
+                return []
+            return await scraper.scrape_posts_comments(post_urls, **kwargs)
+        finally:
+            await scraper.close()
+
+    return asyncio.run(_run())
+
+
 # Example usage
-def main():
+async def main():
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
     # Your Instagram credentials
     USERNAME = "dbt.prasmul"
     PASSWORD = "eseprasmul"
@@ -441,26 +772,19 @@ def main():
 
     try:
         # Start browser
-        scraper.start()
+        await scraper.start()
 
         # Login
-        if not scraper.login():
+        if not await scraper.login():
             print("Login failed, exiting...")
             return
 
-        # Scrape comments from posts
-        all_comments = scraper.scrape_posts_comments(POST_URLS)
-
-        # Save results to JSON
-        output = {
-            'total_posts': len(POST_URLS),
-            'scraped_at': datetime.now().isoformat(),
-            'posts_comments': all_comments,
-        }
-
-        filename = f'./output_comments/instagram_comments_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json'
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
+        # Scrape comments from posts, streaming one JSON line per post to disk
+        filename = f'./output_comments/instagram_comments_{datetime.now().strftime("%Y%m%d_%H%M%S")}.jsonl'
+        with open(filename, 'wb') as f:
+            # Header line first so readers can tell what the run covered without scanning it
+            f.write(_json_line({'scraped_at': datetime.now().isoformat(), 'post_count': len(POST_URLS)}))
+            all_comments = await scraper.scrape_posts_comments(POST_URLS, out_file=f)
 
         print(f"\n✓ Data saved to {filename}")
 
@@ -523,8 +847,8 @@ def main():
 
     finally:
         # Close browser
-        scraper.close()
+        await scraper.close()
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -3,52 +3,118 @@ Instagram Profile and Posts Scraper with Engagement Rate Calculator
 Uses Playwright for web automation
 """
 
-from playwright.sync_api import sync_playwright
-import time
+from playwright.async_api import async_playwright
 import json
+import re
 from datetime import datetime
 import asyncio
+import numpy as np
+
 
 class InstagramScraper:
-    def __init__(self, username, password):
+    # Posts fetched at the same time, each on its own page of the shared context
+    MAX_PARALLEL_PAGES = 5
+
+    # Follower, like and heart counts come from header text, tooltips and the comments XHR;
+    # post thumbnails, reel video and icon fonts feed none of them. Stylesheets stay enabled:
+    # the comment window only scrolls with its overflow styles applied.
+    _BLOCKED_RESOURCE_TYPES = frozenset({'image', 'media', 'font'})
+
+    # Switch off Chromium subsystems a DOM scraper never uses
+    _CHROMIUM_ARGS = [
+        '--disable-dev-shm-usage',
+        '--disable-extensions',
+        '--disable-gpu',
+        '--blink-settings=imagesEnabled=false',
+        '--disable-features=TranslateUI,BlinkGenPropertyTrees',
+        '--disable-background-networking',
+        '--disable-sync',
+        '--metrics-recording-only',
+        '--mute-audio',
+    ]
+
+    # Login form and dialog buttons, comma-joined so one native wait covers every variant
+    _LOGIN_FORM_SELECTOR = 'input[name="email"], input[name="pass"]'
+    _COOKIE_BUTTONS = 'button:has-text("Allow all cookies"), button:has-text("Allow All"), button:has-text("Accept")'
+    _SAVE_INFO_BUTTONS = 'button:has-text("Not now"), button:has-text("Not Now"), button:has-text("Save Info")'
+    _NOTIFICATION_BUTTONS = 'button:has-text("Not Now"), button:has-text("Not now"), button:has-text("Turn Off")'
+
+    # Locator strings are fixed, build them once instead of on every call
+    _PROFILE_HEADER = '//*/div/div/div[2]/div/div/div[1]/div[2]/div[2]/section/main/div/div/header/div/section[2]/div'
+    _FULL_NAME_XPATH = f'xpath={_PROFILE_HEADER}/div[2]/span'
+    _FOLLOWERS_XPATH = f'xpath={_PROFILE_HEADER}/div[3]/div[2]/a/span/span/span'
+    _POSTS_COUNT_XPATH = f'xpath={_PROFILE_HEADER}/div[3]/div[1]/span/span'
+    _FOLLOWING_XPATH = f'xpath={_PROFILE_HEADER}/div/div[3]/a/span/span/span'
+    _BIO_SELECTOR = 'section div._aa_c h1'
+    # Header stat items: an int from the title tooltip when present, otherwise the item's text
+    _PROFILE_STATS_JS = '''() => {
+        const out = {};
+        for (const li of document.querySelectorAll('header section ul li')) {
+            const text = li.textContent.toLowerCase();
+            const title = li.querySelector('[title]')?.getAttribute('title')?.replace(/[,.]/g, '');
+            const value = title && /^\\d+$/.test(title) ? parseInt(title, 10) : li.textContent.replace(/[^\\d.,KkMm]/g, '');
+            if (text.includes('post')) out.posts_count = value;
+            else if (text.includes('follower')) out.followers = value;
+            else if (text.includes('following')) out.following = value;
+        }
+        return out;
+    }'''
+    _POST_LINKS_XPATH = 'xpath=//*/div/div/div[2]/div/div/div[1]/div[2]/div[2]/section/main/div/div/div[2]/div/div/div/div/div/div/a'
+    _COMMENT_WINDOW = '//*/div/div/div[2]/div/div/div[1]/div[1]/div[2]/section/main/div/div[1]/div/div[2]/div/div[2]'
+    _COMMENT_WINDOW_XPATH = f'xpath={_COMMENT_WINDOW}'
+    # Raw XPath (no engine prefix): evaluated in the page with document.evaluate
+    _COMMENT_LIKES_XPATH = f"{_COMMENT_WINDOW}/div/div[2]/div/div/div/div[2]/div[1]/div/div/span/span[contains(text(), 'likes')]"
+    _HEARTS_XPATH = 'xpath=//div/div/div/section/div[1]/span[2]'
+    _COMMENTS_COUNT_XPATH = 'xpath=//div/div/div/section/div/span[4]'
+
+    _NUM_RE = re.compile(r'([\d,.]+)\s*([KMkm]?)\b')
+    _MULTIPLIERS = {'': 1, 'K': 1000, 'k': 1000, 'M': 1000000, 'm': 1000000}
+    _SHARED_DATA_RE = re.compile(r'window\._sharedData\s*=\s*(\{.*?\});</script>', re.DOTALL)
+
+    def __init__(self, username, password, headless=True):
         self.username = username
         self.password = password
+        self.headless = headless
         self.playwright = None
         self.browser = None
+        self.context = None
         self.page = None
 
-    def start(self):
+    async def start(self):
         """Initialize Playwright and browser"""
-        self.playwright = sync_playwright().start()
-        # Use chromium with headless=False to see the browser (set True for background)
+        self.playwright = await async_playwright().start()
+        # Pass headless=False to the constructor to watch the browser
         # self.browser = self.playwright.chromium.launch(headless=False)
         # self.page = self.browser.new_context().new_page()
         # start()
         # self.playwright = sync_playwright().start()
         user_data_dir = r'./user_data'  # choose folder to persist profile/cache
-        self.context = self.playwright.chromium.launch_persistent_context(user_data_dir, headless=False)
+        self.context = await self.playwright.chromium.launch_persistent_context(
+            user_data_dir, headless=self.headless, args=self._CHROMIUM_ARGS
+        )
         # launch_persistent_context may create an initial page
-        self.page = self.context.pages[0] if self.context.pages else self.context.new_page()
+        self.page = self.context.pages[0] if self.context.pages else await self.context.new_page()
+
+    async def _route_request(self, route):
+        """Let documents, scripts, styles and XHRs through; drop thumbnails, video and fonts"""
+        if route.request.resource_type in self._BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
 
-    def _is_login_page(self):
-        """Detect if we're on Instagram login page"""
+    async def _enable_resource_blocking(self):
+        """Start blocking heavy resources (kept off during login so the form renders normally)"""
+        await self.context.route('**/*', self._route_request)
+
+    async def _click_first(self, selector, timeout=3000):
+        """Click the first button matching a comma-joined selector; False if none shows up"""
         try:
-            # Check for login page indicators
-            login_indicators = [
-                'input[name="email"]',
-                'input[name="pass"]',
-            ]
-            
-            for indicator in login_indicators:
-                if self.page.query_selector(indicator):
-                    print(f"✓ Login page detected (found: {indicator})")
-                    return True
-            return False
-        except Exception as e:
-            print(f"Error detecting login page: {e}")
+            await self.page.locator(selector).first.click(timeout=timeout)
+            return True
+        except Exception:
             return False
 
-    def _click_login_button(self, timeout=10000):
+    async def _click_login_button(self, timeout=10000):
         """Try multiple XPath selectors to click the login button"""
         button_selectors = [
             "xpath=//*[@id='login_form']/div/div[1]/div/div[3]/div/div/div",
@@ -57,9 +123,9 @@ class InstagramScraper:
         for selector in button_selectors:
             try:
                 print(f"Attempting: {selector}")
-                element = self.page.query_selector(selector)
+                element = await self.page.query_selector(selector)
                 if element:
-                    self.page.click(selector, timeout=timeout)
+                    await self.page.click(selector, timeout=timeout)
                     print(f"✓ Clicked login button with: {selector}")
                     return True
             except Exception as e:
@@ -69,48 +135,41 @@ class InstagramScraper:
         print("⚠️ Could not find login button")
         return False
 
-    def login(self):
+    async def _is_logged_in(self):
+        """Check whether the persistent profile still holds a valid session"""
+        try:
+            await self.page.goto('https://www.instagram.com/', timeout=60000, wait_until='domcontentloaded')
+            await self.page.wait_for_selector('svg[aria-label="Home"], input[name="email"]', timeout=10000)
+            return await self.page.query_selector('svg[aria-label="Home"]') is not None
+        except Exception as e:
+            print(f"Could not verify existing session: {e}")
+            return False
+
+    async def login(self):
         """Login to Instagram with credentials"""
+        # Cookies live in ./user_data across runs; only log in when they have expired
+        if await self._is_logged_in():
+            print("✓ Already logged in from saved profile, skipping login flow")
+            await self._enable_resource_blocking()
+            return True
+
         print("Navigating to Instagram login...")
         try:
-            self.page.goto('https://www.instagram.com/accounts/login/', timeout=60000, wait_until='domcontentloaded')
-            time.sleep(2)
+            await self.page.goto('https://www.instagram.com/accounts/login/', timeout=60000, wait_until='domcontentloaded')
         except Exception as e:
             print(f"Error navigating to login page: {e}")
             return False
 
-        # Wait and verify we're on login page
-        max_wait = 10
-        for i in range(max_wait):
-            if self._is_login_page():
-                print("✓ Successfully loaded login page")
-                break
-            if i < max_wait - 1:
-                print(f"⏳ Waiting for login page... ({i+1}/{max_wait})")
-                time.sleep(1)
-            else:
-                print("⚠️ Login page did not load within timeout")
-
-        time.sleep(1)
-
-        # Accept cookies if prompt appears
+        # Wait for whichever login field renders first
         try:
-            cookie_buttons = [
-                'button:has-text("Allow all cookies")',
-                'button:has-text("Allow All")',
-                'button:has-text("Accept")',
-            ]
-            for btn_selector in cookie_buttons:
-                try:
-                    self.page.click(btn_selector, timeout=3000)
-                    print("✓ Cookies accepted")
-                    break
-                except:
-                    continue
-        except Exception as e:
-            print(f"⚠️ Cookie dialog skipped: {e}")
+            await self.page.wait_for_selector(self._LOGIN_FORM_SELECTOR, timeout=10000)
+            print("✓ Successfully loaded login page")
+        except Exception:
+            print("⚠️ Login page did not load within timeout")
 
-        time.sleep(1)
+        # Accept cookies if prompt appears
+        if await self._click_first(self._COOKIE_BUTTONS):
+            print("✓ Cookies accepted")
 
         # Fill in username
         try:
@@ -119,7 +178,7 @@ class InstagramScraper:
             ]
             for sel in username_selectors:
                 try:
-                    self.page.fill(sel, self.username, timeout=5000)
+                    await self.page.fill(sel, self.username, timeout=5000)
                     print(f"✓ Username filled using: {sel}")
                     break
                 except:
@@ -127,8 +186,6 @@ class InstagramScraper:
         except Exception as e:
             print(f"Error filling username: {e}")
 
-        time.sleep(0.5)
-
         # Fill in password
         try:
             password_selectors = [
@@ -136,7 +193,7 @@ class InstagramScraper:
             ]
             for sel in password_selectors:
                 try:
-                    self.page.fill(sel, self.password, timeout=5000)
+                    await self.page.fill(sel, self.password, timeout=5000)
                     print(f"✓ Password filled using: {sel}")
                     break
                 except:
@@ -144,58 +201,84 @@ class InstagramScraper:
         except Exception as e:
             print(f"Error filling password: {e}")
 
-        time.sleep(1)
-
         # Click login button
-        is_login_success = self._click_login_button()
+        is_login_success = await self._click_login_button()
         if(not is_login_success):
             print("⚠️ Login button click failed, aborting login flow")
             return
-        time.sleep(5)
-
-        # Handle "Save login info" prompt
         try:
-            save_buttons = [
-                'button:has-text("Not now")',
-                'button:has-text("Not Now")',
-                'button:has-text("Save Info")',
-            ]
-            for btn in save_buttons:
-                try:
-                    self.page.click(btn, timeout=3000)
-                    print("✓ 'Save login info' dismissed")
-                    break
-                except:
-                    continue
-        except:
-            pass
+            await self.page.wait_for_url(lambda url: '/accounts/login' not in url, timeout=15000)
+        except Exception:
+            print("⚠️ Still on the login page after 15s")
 
-        time.sleep(1)
+        # Handle "Save login info" prompt
+        if await self._click_first(self._SAVE_INFO_BUTTONS):
+            print("✓ 'Save login info' dismissed")
 
         # Handle "Turn on notifications" prompt
-        try:
-            notif_buttons = [
-                'button:has-text("Not Now")',
-                'button:has-text("Not now")',
-                'button:has-text("Turn Off")',
-            ]
-            for btn in notif_buttons:
-                try:
-                    self.page.click(btn, timeout=3000)
-                    print("✓ Notifications prompt dismissed")
-                    break
-                except:
-                    continue
-        except:
-            pass
+        if await self._click_first(self._NOTIFICATION_BUTTONS):
+            print("✓ Notifications prompt dismissed")
 
         print("✓ Login flow completed")
+        await self._enable_resource_blocking()
+
+    def _profile_from_user(self, profile_username, user):
+        """Map an Instagram user JSON object onto the profile fields (counts arrive as ints)"""
+        return {
+            'username': profile_username,
+            'full_name': user.get('full_name') or 'N/A',
+            'followers': user.get('edge_followed_by', {}).get('count', 0),
+            'posts_count': user.get('edge_owner_to_timeline_media', {}).get('count', 0),
+            'following': user.get('edge_follow', {}).get('count', 0),
+            'bio': user.get('biography') or 'N/A',
+        }
 
-    def scrape_profile(self, profile_username):
+    async def _fetch_profile_json(self, profile_username):
+        """Read the profile from Instagram's JSON endpoint without rendering the page"""
+        try:
+            # The context's request client carries the logged-in cookies
+            resp = await self.context.request.get(
+                f'https://www.instagram.com/{profile_username}/?__a=1&__d=dis',
+                headers={'Accept': 'application/json'}, timeout=15000
+            )
+            if resp.status != 200:
+                raise Exception(f'HTTP {resp.status}')
+            user = (await resp.json()).get('graphql', {}).get('user')
+        except Exception as e:
+            print(f"⚠️ Profile JSON not available ({str(e)[:60]}), reading the page instead")
+            return None
+        return self._profile_from_user(profile_username, user) if user else None
+
+    async def _shared_data_profile(self, profile_username, page):
+        """Read the profile from the window._sharedData blob embedded in the loaded page"""
+        try:
+            match = self._SHARED_DATA_RE.search(await page.content())
+            if not match:
+                return None
+            user = json.loads(match.group(1))['entry_data']['ProfilePage'][0]['graphql']['user']
+        except Exception:
+            return None
+        return self._profile_from_user(profile_username, user)
+
+    async def scrape_profile(self, profile_username, page=None):
         """Scrape profile information"""
+        page = page or self.page
         print(f"Scraping profile: {profile_username}")
-        self.page.goto(f'https://www.instagram.com/{profile_username}/')
-        time.sleep(3)
+        profile_data = await self._fetch_profile_json(profile_username)
+        if profile_data:
+            print(f"Profile data: {json.dumps(profile_data, indent=2)}")
+            return profile_data
+
+        await page.goto(f'https://www.instagram.com/{profile_username}/', wait_until='domcontentloaded')
+        profile_data = await self._shared_data_profile(profile_username, page)
+        if profile_data:
+            print(f"Profile data: {json.dumps(profile_data, indent=2)}")
+            return profile_data
+
+        try:
+            await page.wait_for_selector('main header section', timeout=10000)
+        except Exception:
+            print("⚠️ Profile header did not render within 10s")
 
         profile_data = {}
 
@@ -205,38 +288,35 @@ class InstagramScraper:
 
             # Get full name
             try:
-                profile_data['full_name'] = self.page.locator('xpath=//*/div/div/div[2]/div/div/div[1]/div[2]/div[2]/section/main/div/div/header/div/section[2]/div/div[2]/span').inner_text()
+                profile_data['full_name'] = await page.locator(self._FULL_NAME_XPATH).inner_text()
             except:
                 profile_data['full_name'] = 'N/A'
             print(f"Full name: {profile_data['full_name']}")
 
-            #get followers count
+            # Read all header counts in one round trip; exact values come from the title tooltips
             try:
-                followers_text = self.page.locator('xpath=//*/div/div/div[2]/div/div/div[1]/div[2]/div[2]/section/main/div/div/header/div/section[2]/div/div[3]/div[2]/a/span/span/span').inner_text()
-                profile_data['followers'] = self._parse_number(followers_text)
-            except:
-                profile_data['followers'] = 0
+                stats = await page.evaluate(self._PROFILE_STATS_JS)
+            except Exception:
+                stats = {}
+            for key, xpath in (('followers', self._FOLLOWERS_XPATH),
+                               ('posts_count', self._POSTS_COUNT_XPATH),
+                               ('following', self._FOLLOWING_XPATH)):
+                value = stats.get(key)
+                if isinstance(value, str):
+                    value = self._parse_number(value)
+                if value is None:
+                    try:
+                        value = self._parse_number(await page.locator(xpath).inner_text())
+                    except:
+                        value = 0
+                profile_data[key] = value
             print(f"Followers: {profile_data['followers']}")
-
-            #get posts count
-            try:
-                posts_text = self.page.locator('xpath=//*/div/div/div[2]/div/div/div[1]/div[2]/div[2]/section/main/div/div/header/div/section[2]/div/div[3]/div[1]/span/span').inner_text()
-                profile_data['posts_count'] = self._parse_number(posts_text)
-            except:
-                profile_data['posts_count'] = 0
             print(f"Posts count: {profile_data['posts_count']}")
-
-            #get following count
-            try:
-                following_text = self.page.locator('xpath=//*/div/div/div[2]/div/div/div[1]/div[2]/div[2]/section/main/div/div/header/div/section[2]/div/div/div[3]/a/span/span/span').inner_text()
-                profile_data['following'] = self._parse_number(following_text)
-            except:
-                profile_data['following'] = 0
             print(f"Following: {profile_data['following']}")
 
             # Get bio
             try:
-                profile_data['bio'] = self.page.locator('section div._aa_c h1').inner_text()
+                profile_data['bio'] = await page.locator(self._BIO_SELECTOR).inner_text()
             except:
                 profile_data['bio'] = 'N/A'
 
@@ -247,96 +327,172 @@ class InstagramScraper:
             print(f"Error scraping profile: {e}")
             return profile_data
 
-    def scrape_posts(self, profile_username, num_posts=12):
-        """Scrape posts from profile"""
+    async def scrape_posts(self, profile_username, num_posts=12, page=None, max_pages=None):
+        """Scrape posts from profile, on at most max_pages pages (MAX_PARALLEL_PAGES by default)"""
+        page = page or self.page
+        max_pages = max_pages or self.MAX_PARALLEL_PAGES
         print(f"Scraping posts from: {profile_username}")
 
         posts_data = []
 
         try:
             # Get all post links
-            self.page.goto(f'https://www.instagram.com/{profile_username}/')
-            time.sleep(3)
+            await page.goto(f'https://www.instagram.com/{profile_username}/', wait_until='domcontentloaded')
+            try:
+                await page.wait_for_selector('main a[href*="/p/"], main a[href*="/reel/"]', timeout=10000)
+            except Exception:
+                print("⚠️ Post grid did not render within 10s")
 
             # Scroll to load posts
             for _ in range(1):
-                self.page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-                time.sleep(2)
+                await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
+                try:
+                    await page.wait_for_load_state('networkidle', timeout=2000)
+                except Exception:
+                    pass
 
             # Get post links
-            post_links = self.page.locator('xpath=//*/div/div/div[2]/div/div/div[1]/div[2]/div[2]/section/main/div/div/div[2]/div/div/div/div/div/div/a').all()
-            post_urls = [link.get_attribute('href') for link in post_links]
+            post_links = await page.locator(self._POST_LINKS_XPATH).all()
+            post_urls = [await link.get_attribute('href') for link in post_links][:num_posts]
 
             print(f"Found {len(post_urls)} posts to scrape")
-            time.sleep(2)
-            # Visit each post and get details
-            for idx, post_url in enumerate(post_urls, 1):
-                print(f"Scraping post {idx}/{len(post_urls)}")
-                full_url = f"https://www.instagram.com{post_url}"
 
-                post_data = self._scrape_single_post(full_url)
-                posts_data.append(post_data)
+            # Small pool of pages in the logged-in context; posts are fetched concurrently,
+            # each one borrowing a page for as long as it needs it
+            pool = asyncio.Queue()
+            pool.put_nowait(page)
+            extra_pages = []
+            for _ in range(min(max_pages, len(post_urls)) - 1):
+                extra_page = await self.context.new_page()
+                extra_pages.append(extra_page)
+                pool.put_nowait(extra_page)
 
-                time.sleep(2)
-                # break
+            try:
+                # One failing post must not discard the others or leave them running on closed pages
+                results = await asyncio.gather(*[
+                    self._scrape_pooled_post(pool, idx, len(post_urls), f"https://www.instagram.com{post_url}")
+                    for idx, post_url in enumerate(post_urls, 1)
+                ], return_exceptions=True)
+            finally:
+                for extra_page in extra_pages:
+                    await extra_page.close()
+            for post_url, result in zip(post_urls, results):
+                if isinstance(result, Exception):
+                    print(f"⚠️ Error scraping post {post_url}: {result}")
+                else:
+                    posts_data.append(result)
             return posts_data
 
         except Exception as e:
             print(f"Error scraping posts: {e}")
             return posts_data
 
-    def _scrape_single_post(self, post_url):
+    async def _scrape_pooled_post(self, pool, idx, total, post_url):
+        """Borrow a page from the pool, scrape one post on it and hand the page back"""
+        page = await pool.get()
+        try:
+            print(f"Scraping post {idx}/{total}")
+            return await self._scrape_single_post(post_url, page)
+        finally:
+            pool.put_nowait(page)
+
+    @staticmethod
+    def _is_comments_response(response):
+        """Match the XHR that carries a post's comments"""
+        return '/api/v1/media/' in response.url and '/comments/' in response.url and response.ok
+
+    async def _comments_from_response(self, comments_response):
+        """Return (comments, comment likes) from a complete comments payload, else None"""
+        try:
+            data = await (await comments_response).json()
+        except Exception:
+            return None  # No comments XHR seen, or not JSON
+        comments = data.get('comments')
+        # A cursor means more pages follow; those only load by scrolling
+        if comments is None or data.get('has_more_comments') or data.get('next_min_id') or data.get('next_max_id'):
+            return None
+        comment_count = data.get('comment_count', len(comments))
+        comment_likes = sum(c.get('comment_like_count', 0) or 0 for c in comments)
+        return comment_count, comment_likes
+
+    async def _scrape_single_post(self, post_url, page=None):
         """Scrape single post details"""
-        self.page.goto(post_url)
-        print('*'*70)
-        print(f"Scraping post: {post_url}")
-        time.sleep(3)
+        page = page or self.page
+        # Pooled pages just showed another post, whose comment XHRs may still be in flight.
+        # Listen only once the new document has committed, so those can't be taken for this one
+        await page.goto(post_url, wait_until='commit')
+        # The post page fetches its first batch of comments as JSON; catch that response
+        comments_response = asyncio.ensure_future(
+            page.wait_for_event('response', predicate=self._is_comments_response, timeout=5000)
+        )
+        try:
+            await page.wait_for_load_state('domcontentloaded')
+            print('*'*70)
+            print(f"Scraping post: {post_url}")
+            api_counts = await self._comments_from_response(comments_response)
+        finally:
+            # Don't leave the wait running (or its timeout unretrieved) when loading fails
+            if not comments_response.done():
+                comments_response.cancel()
+            elif not comments_response.cancelled():
+                comments_response.exception()
+        post_data = {
+            'url': post_url,
+            'likes': 0,
+            'hearts': 0,
+            'comments': 0,
+        }
+
+        if api_counts:
+            # Every comment arrived in that one payload: no scrolling or DOM counting needed
+            post_data['comments'], post_data['likes'] = api_counts
+            print(f"✓ Read {post_data['comments']} comments from the comments API response")
+            try:
+                heart_likes = await page.locator(self._HEARTS_XPATH).inner_text()
+                post_data['hearts'] = self._parse_number(heart_likes)
+            except:
+                pass
+            return post_data
 
         # Scroll to bottom of comment window if present
         try:
             # Find the comment window element (Instagram uses a div with role="dialog" or similar)
-            comment_window = self.page.query_selector('xpath=//*/div/div/div[2]/div/div/div[1]/div[1]/div[2]/section/main/div/div[1]/div/div[2]/div/div[2]')
+            try:
+                comment_window = await page.wait_for_selector(self._COMMENT_WINDOW_XPATH, timeout=5000)
+            except Exception:
+                comment_window = None
             if comment_window:
                 max_attempts = 20
                 for i in range(max_attempts):
-                    val1 = self.page.evaluate('el => el.scrollTop = el.scrollHeight', comment_window)
-                    time.sleep(3)
-                    curr_scroll = self.page.evaluate('el => el.scrollHeight', comment_window)
-                    if val1 == curr_scroll:
+                    # One round-trip scrolls and reports the height it scrolled to
+                    height = await page.evaluate('el => { const h = el.scrollHeight; el.scrollTop = h; return h; }', comment_window)
+                    # Returns as soon as more comments render; 3s without growth means we are done
+                    try:
+                        await page.wait_for_function('([el, h]) => el.scrollHeight > h', arg=[comment_window, height], timeout=3000)
+                    except Exception:
                         print(f"✓ Scrolled to bottom of comment window after {i+1} attempts")
                         break
                 else:
                     print(f"⚠️ Reached max scroll attempts ({max_attempts}) in comment window")
-                self.page.evaluate('el => el.scrollTop', comment_window)
             else:
                 # Fallback: scroll main page
-                self.page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
+                await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
                 print("✓ Scrolled to bottom of main page")
         except Exception as e:
             print(f"⚠️ Could not scroll comment window: {e}")
-        post_data = {
-            'url': post_url,
-            'likes': 0,
-            'hearts': 0,
-            'comments': 0,
-        }
-
-
 
         try:
             # Get likes count for each comment
             try:
-                raw_likes_on_comments = self.page.locator("xpath=//*/div/div/div[2]/div/div/div[1]/div[1]/div[2]/section/main/div/div[1]/div/div[2]/div/div[2]/div/div[2]/div/div/div/div[2]/div[1]/div/div/span/span[contains(text(), 'likes')]")
-                likes_onComments = []
-                for text in raw_likes_on_comments.all():
-                    text_content = text.text_content()
-                    count = self._parse_number(text_content)
-                    if 'K' in text_content.replace("likes", "").strip().upper():
-                        likes_onComments.append(count * 1000)
-                    elif 'M' in text_content.replace("likes", "").strip().upper():
-                        likes_onComments.append(count * 1000000)
-                    else:
-                        likes_onComments.append(count)
+                # All like labels come back in one evaluate instead of one text_content() per comment
+                like_texts = await page.evaluate('''(xpath) => {
+                    const snap = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+                    const texts = [];
+                    for (let i = 0; i < snap.snapshotLength; i++) texts.push(snap.snapshotItem(i).textContent);
+                    return texts;
+                }''', self._COMMENT_LIKES_XPATH)
+                # _parse_number already applies the K/M multiplier
+                likes_onComments = [self._parse_number(text_content) for text_content in like_texts]
                 print(likes_onComments)
                 post_data['likes'] = sum(likes_onComments) if likes_onComments else 0
             except:
@@ -344,14 +500,14 @@ class InstagramScraper:
             
             #get heart likes
             try:
-                heart_likes = self.page.locator('xpath=//div/div/div/section/div[1]/span[2]').inner_text()
+                heart_likes = await page.locator(self._HEARTS_XPATH).inner_text()
                 post_data['hearts'] = self._parse_number(heart_likes)
             except:
                 pass
 
             # Get comments count
             try:
-                comments = self.page.locator('xpath=//div/div/div/section/div/span[4]').inner_text()
+                comments = await page.locator(self._COMMENTS_COUNT_XPATH).inner_text()
                 post_data['comments'] = self._parse_number(comments)
             except:
                 pass
@@ -361,6 +517,30 @@ class InstagramScraper:
 
         return post_data
 
+    async def scrape_many(self, usernames, num_posts=12, concurrency=4):
+        """Scrape several profiles at once, each on its own page of the logged-in browser
+
+        Returns (profile_data, posts_data) per username, in the order given, or the
+        exception that profile failed with. MAX_PARALLEL_PAGES is shared between the
+        profiles in flight, so the account never has more post pages open than that.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        pages_per_profile = max(1, self.MAX_PARALLEL_PAGES // concurrency)
+
+        async def scrape_one(profile_username):
+            async with semaphore:
+                # Pages of the persistent context all carry the logged-in cookies
+                page = await self.context.new_page()
+                try:
+                    profile_data = await self.scrape_profile(profile_username, page)
+                    posts_data = await self.scrape_posts(profile_username, num_posts, page, pages_per_profile)
+                    return profile_data, posts_data
+                finally:
+                    await page.close()
+
+        # One failing profile must not discard the others or leave them running on a closed browser
+        return await asyncio.gather(*[scrape_one(u) for u in usernames], return_exceptions=True)
+
     def calculate_engagement_rate(self, post_data, followers_count):
         """Calculate engagement rate for a single post"""
         total_engagement = post_data['likes'] + post_data['comments']+ post_data['hearts']
@@ -377,46 +557,39 @@ class InstagramScraper:
         if not posts_data or followers_count == 0:
             return 0
 
-        total_engagement_rate = 0
-        valid_posts = 0
-
-        for post in posts_data:
-            engagement_rate = self.calculate_engagement_rate(post, followers_count)
-            total_engagement_rate += engagement_rate
-            valid_posts += 1
-
-        avg_engagement = total_engagement_rate / valid_posts if valid_posts > 0 else 0
-        return round(avg_engagement, 2)
+        # Sum engagement over all posts in one vectorized pass; only the final
+        # average is rounded, not every per-post rate
+        engagement = np.fromiter(
+            (post['likes'] + post['comments'] + post['hearts'] for post in posts_data),
+            dtype=np.int64, count=len(posts_data)
+        )
+        avg_engagement = engagement.sum() / (len(engagement) * followers_count) * 100
+        return round(float(avg_engagement), 2)
 
     def _parse_number(self, text):
         """Parse number from text (handles K, M suffixes)"""
-        text = text.strip().split()[0]
-        multiplier = 1
-
-        if 'K' in text.upper():
-            multiplier = 1000
-            text = text.upper().replace('K', '')
-        elif 'M' in text.upper():
-            multiplier = 1000000
-            text = text.upper().replace('M', '')
-
+        match = self._NUM_RE.match(text.strip())
+        if not match:
+            return 0
         try:
-            number = float(text.replace(',', ''))
-            return int(number * multiplier)
-        except:
+            number = float(match.group(1).replace(',', ''))
+        except ValueError:
             return 0
+        return int(number * self._MULTIPLIERS[match.group(2)])
 
-    def close(self):
+    async def close(self):
         """Close browser and playwright"""
+        if self.context:
+            await self.context.close()
         if self.browser:
-            self.browser.close()
+            await self.browser.close()
         if self.playwright:
-            self.playwright.stop()
+            await self.playwright.stop()
         print("Browser closed")
 
 
 # Example usage
-def main():
+async def main():
     # Your Instagram credentials
     USERNAME = "XXX"
     PASSWORD = "YYY"
@@ -432,18 +605,19 @@ def main():
 
     try:
         # Start browser
-        scraper.start()
+        await scraper.start()
 
         # Step 1: Login
-        scraper.login()
+        await scraper.login()
 
-        for profile in TARGET_PROFILE:
-            print(f"Scraping profile: {profile}")
-            # Step 2: Scrape profile
-            profile_data = scraper.scrape_profile(profile)
+        # Steps 2 & 3: Scrape profiles and their posts, several profiles at a time
+        results = await scraper.scrape_many(TARGET_PROFILE, NUM_POSTS)
 
-            # Step 3: Scrape posts
-            posts_data = scraper.scrape_posts(profile, NUM_POSTS)
+        for profile, result in zip(TARGET_PROFILE, results):
+            if isinstance(result, Exception):
+                print(f"⚠️ Error scraping profile {profile}: {result}")
+                continue
+            profile_data, posts_data = result
 
             # Get followers count for engagement calculation
             followers_count = profile_data.get('followers', 0)
@@ -494,9 +668,9 @@ def main():
 
     finally:
         # Close browser
-        scraper.close()
+        await scraper.close()
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
 
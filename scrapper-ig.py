@@ -9,95 +9,201 @@ Usage:
 python script.py
 """
 
-from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
+import asyncio
 import json
-import time
+import os
 from datetime import datetime
 import re
 import argparse
 
+try:
+    import orjson
+except ImportError:  # Optional: falls back to the stdlib parser
+    orjson = None
+
+# Patterns used inside the per-element parsing loops, compiled once
+_META_RE = re.compile(r'([\d,]+)\s*(Followers|Following|Posts)')
+_NUM_RE = re.compile(r'([\d,\.]+[KMB]?)')
+_NUM_ONLY_RE = re.compile(r'^[\d,\.]+[KMB]?\s*$')
+_SHORTCODE_RE = re.compile(r'/(?:p|reel)/([^/?#]+)')
+_MULTIPLIERS = {'K': 1_000, 'M': 1_000_000, 'B': 1_000_000_000}
+
+
+def _loads(raw):
+    """Decode a JSON body, with orjson when it is installed"""
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
 class InstagramEngagementScraper:
-    def __init__(self, headless=False, guest_mode=True):
-        """guest_mode: when True, avoid logging in and use public JSON endpoints as fallback"""
+    # Post pages open at the same time while collecting engagement
+    MAX_PARALLEL_PAGES = 4
+    # Cookies and local storage carried over between runs
+    STATE_FILE = 'state.json'
+    # Profile JSON responses, one file per username and hour
+    CACHE_DIR = '.ig_cache'
+    # Only meta tags and counters are read: skip the heavy assets and analytics beacons
+    _BLOCKED_RESOURCE_TYPES = frozenset({'image', 'media', 'font', 'stylesheet'})
+    _BLOCKED_URL_PARTS = ('facebook.com/tr', 'google-analytics')
+    # Selector strings are fixed, so bind them once instead of rebuilding them per post
+    _POST_LINK_SEL = 'article a[href*="/p/"]'
+    _LOGIN_WALL_SEL = 'text=/Log in to (see|continue|view)|Only people who follow/i'
+    _LIKE_SELECTORS = (
+        'section span[class*="xdj266r"]',  # Common like counter class
+        'section button span',
+        'a[href*="/liked_by/"] span'
+    )
+    # Any span mentioning comments (what span:has-text("comment") matched)
+    _COMMENT_SELECTORS = ('span',)
+    # Likes/comments text of a post page in one round trip, same rules as the old per-element loop
+    _POST_STATS_JS = r'''([likeSelectors, commentSelectors]) => {
+        const num = /([\d,.]+[KMB]?)/;
+        const numOnly = /^[\d,.]+[KMB]?\s*$/;
+        const firstMatch = (selectors, accept) => {
+            for (const sel of selectors) {
+                for (const el of document.querySelectorAll(sel)) {
+                    const text = el.innerText;
+                    if (!accept(text)) continue;
+                    const m = text.match(num);
+                    if (m) return m[1];
+                }
+            }
+            return null;
+        };
+        return {
+            likes: firstMatch(likeSelectors, t => /like/i.test(t) || numOnly.test(t)),
+            comments: firstMatch(commentSelectors, t => /comment/i.test(t)),
+            commentItems: document.querySelectorAll('ul ul li[role="menuitem"]').length,
+        };
+    }'''
+
+    def __init__(self, headless=False, guest_mode=True, use_cache=True):
+        """guest_mode: when True, avoid logging in and use public JSON endpoints as fallback
+        use_cache: reuse profile JSON fetched within the same hour from CACHE_DIR"""
         self.headless = headless
         self.guest_mode = guest_mode
+        self.use_cache = use_cache
         self.engagement_data = {}
     
-    def scrape_profile(self, username):
+    def scrape_profile_sync(self, username):
+        """Blocking wrapper around scrape_profile for callers without an event loop"""
+        return asyncio.run(self.scrape_profile(username))
+
+    def scrape_profiles_sync(self, usernames):
+        """Blocking wrapper around scrape_profiles"""
+        return asyncio.run(self.scrape_profiles(usernames))
+
+    async def scrape_profile(self, username):
         """Scrape Instagram profile and calculate engagement metrics"""
+        return (await self.scrape_profiles([username]))[0]
+
+    async def scrape_profiles(self, usernames):
+        """Scrape several profiles with one browser launch; returns a result (or None) per username"""
         
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=self.headless)
-            context = browser.new_context(
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=self.headless)
+            # Reload cookies from the previous run so Instagram sees a returning visitor
+            context = await browser.new_context(
                 viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+                storage_state=self.STATE_FILE if os.path.exists(self.STATE_FILE) else None
             )
-            page = context.new_page()
+            await context.route('**/*', self._route_request)
             
             try:
-                print(f"Scraping profile: {username}")
+                results = [await self._scrape_one(context, username) for username in usernames]
+                try:
+                    await context.storage_state(path=self.STATE_FILE)
+                except Exception as e:
+                    print(f"Warning: could not save browser state - {str(e)}")
+                return results
+            
+            finally:
+                await browser.close()
+
+    async def _route_request(self, route):
+        """Drop assets, stylesheets and analytics beacons; meta tags and JSON still load"""
+        request = route.request
+        if request.resource_type in self._BLOCKED_RESOURCE_TYPES or any(
+                part in request.url for part in self._BLOCKED_URL_PARTS):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _scrape_one(self, context, username):
+        """Scrape one profile on an already running browser context"""
+        page = await context.new_page()
+        
+        try:
+            print(f"Scraping profile: {username}")
+            cached = self._read_cache(username)
+            if cached:
+                print(f"Using cached profile JSON for @{username}")
+                json_profile, json_posts = cached
+            else:
                 url = f"https://www.instagram.com/{username}/"
-                page.goto(url, wait_until='networkidle', timeout=30000)
+                # Instagram keeps long-poll XHRs open, so networkidle rarely fires; the
+                # stats and posts helpers wait for their own selectors instead
+                await page.goto(url, wait_until='domcontentloaded', timeout=15000)
+
+                # The JSON endpoint already carries likes/comments for the recent posts;
+                # only open post pages when it comes back empty
+                json_profile, json_posts = await self._fetch_profile_json(username, context)
+            if json_posts and json_profile['followers'] > 0:
+                if not cached:
+                    self._write_cache(username, json_profile, json_posts)
+                profile_data, posts_data = json_profile, json_posts
+            else:
+                profile_data, posts_data = await self._scrape_profile_page(page, json_profile, json_posts)
+            
+            # Calculate engagement metrics
+            engagement_metrics = self._calculate_engagement(profile_data, posts_data)
+            
+            result = {
+                **profile_data,
+                **engagement_metrics,
+                'posts_analyzed': len(posts_data),
+                'timestamp': datetime.now().isoformat()
+            }
+            
+            print(f"\n{'='*60}")
+            print(f"ENGAGEMENT REPORT: @{username}")
+            print(f"{'='*60}")
+            self._print_report(result)
+            
+            return result
+            
+        except Exception as e:
+            print(f"Error: {str(e)}")
+            return None
+        
+        finally:
+            await page.close()
+    
+    async def _scrape_profile_page(self, page, json_profile, json_posts):
+        """DOM fallback for when the JSON endpoint returned no posts"""
+        # Get profile stats and posts from the page
+        profile_data = await self._extract_profile_stats(page)
+        posts_data = await self._extract_posts_data(page, max_posts=12)
 
-                # Wait for content to load
-                time.sleep(3)
+        # If running in guest mode or page scraping failed (Instagram shows login wall),
+        # keep whatever the JSON endpoint did return. The login wall is probed inside the
+        # page rather than by pulling the whole HTML over.
+        try:
+            is_login_wall = await page.locator(self._LOGIN_WALL_SEL).count() > 0
+        except:
+            is_login_wall = False
 
-                # Get profile stats and posts (try page first)
-                profile_data = self._extract_profile_stats(page)
-                posts_data = self._extract_posts_data(page, max_posts=12)
+        need_fallback = (self.guest_mode or is_login_wall or profile_data.get('followers', 0) == 0 or len(posts_data) == 0)
 
-                # If running in guest mode or page scraping failed (Instagram shows login wall),
-                # try the JSON endpoint fallback which often works for public profiles.
-                login_wall_texts = [
-                    'Log in to see', 'Log in to continue', 'Log in to view', 'Only people who follow'
-                ]
-                page_text = ''
-                try:
-                    page_text = page.content()
-                except:
-                    pass
+        if need_fallback:
+            if json_profile['followers'] > 0:
+                profile_data = json_profile
+            if json_posts:
+                posts_data = json_posts
 
-                need_fallback = (self.guest_mode or profile_data.get('followers', 0) == 0 or len(posts_data) == 0)
-                for t in login_wall_texts:
-                    if t.lower() in page_text.lower():
-                        need_fallback = True
-                        break
+        return profile_data, posts_data
 
-                if need_fallback:
-                    try:
-                        json_profile, json_posts = self._fetch_profile_json(username, p)
-                        if json_profile:
-                            profile_data = json_profile
-                        if json_posts:
-                            posts_data = json_posts
-                    except Exception as e:
-                        print(f"JSON fallback failed: {e}")
-                
-                # Calculate engagement metrics
-                engagement_metrics = self._calculate_engagement(profile_data, posts_data)
-                
-                result = {
-                    **profile_data,
-                    **engagement_metrics,
-                    'posts_analyzed': len(posts_data),
-                    'timestamp': datetime.now().isoformat()
-                }
-                
-                print(f"\n{'='*60}")
-                print(f"ENGAGEMENT REPORT: @{username}")
-                print(f"{'='*60}")
-                self._print_report(result)
-                
-                return result
-                
-            except Exception as e:
-                print(f"Error: {str(e)}")
-                return None
-            
-            finally:
-                browser.close()
-    
-    def _extract_profile_stats(self, page):
+    async def _extract_profile_stats(self, page):
         """Extract follower count, following, and post count"""
         
         data = {
@@ -108,12 +214,12 @@ class InstagramEngagementScraper:
         
         try:
             # Method 1: Try to get from meta tags
-            page.wait_for_selector('meta[property="og:description"]', timeout=5000)
-            meta_desc = page.get_attribute('meta[property="og:description"]', 'content')
+            await page.wait_for_selector('meta[property="og:description"]', timeout=5000)
+            meta_desc = await page.get_attribute('meta[property="og:description"]', 'content')
             
             if meta_desc:
                 # Parse: "X Followers, Y Following, Z Posts"
-                numbers = re.findall(r'([\d,]+)\s*(Followers|Following|Posts)', meta_desc)
+                numbers = _META_RE.findall(meta_desc)
                 for num, label in numbers:
                     clean_num = int(num.replace(',', ''))
                     if 'Follower' in label:
@@ -123,14 +229,19 @@ class InstagramEngagementScraper:
                     elif 'Post' in label:
                         data['total_posts'] = clean_num
             
+            # Meta tag had everything; skip the header lookup
+            if data['followers'] > 0 and data['total_posts'] > 0:
+                return data
+            
             # Method 2: Try to get from page text
             if data['followers'] == 0:
                 try:
-                    # Look for spans or links containing stats
-                    stats = page.locator('header section ul li').all()
-                    for i, stat in enumerate(stats[:3]):
-                        text = stat.inner_text()
-                        number = re.search(r'([\d,\.]+[KMB]?)', text)
+                    # Look for spans or links containing stats, all three texts in one call
+                    stats = await page.evaluate(
+                        "Array.from(document.querySelectorAll('header section ul li')).slice(0, 3).map(e => e.innerText)"
+                    )
+                    for i, text in enumerate(stats):
+                        number = _NUM_RE.search(text)
                         if number:
                             value = self._convert_to_number(number.group(1))
                             if i == 0:
@@ -147,7 +258,33 @@ class InstagramEngagementScraper:
         
         return data
 
-    def _fetch_profile_json(self, username, playwright_obj):
+    def _cache_path(self, username):
+        """Cache file for username, keyed by the current hour so entries expire on their own"""
+        return os.path.join(self.CACHE_DIR, f"{username}_{datetime.now():%Y%m%d%H}.json")
+
+    def _read_cache(self, username):
+        """Return the cached (profile, posts) for this hour, or None"""
+        if not self.use_cache:
+            return None
+        try:
+            with open(self._cache_path(username), 'rb') as f:
+                cached = _loads(f.read())
+            return cached['profile'], cached['posts']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_cache(self, username, profile, posts):
+        """Store a complete JSON result for reruns within the hour"""
+        if not self.use_cache:
+            return
+        try:
+            os.makedirs(self.CACHE_DIR, exist_ok=True)
+            with open(self._cache_path(username), 'w', encoding='utf-8') as f:
+                json.dump({'profile': profile, 'posts': posts}, f)
+        except OSError as e:
+            print(f"Warning: could not write cache - {str(e)}")
+
+    async def _fetch_profile_json(self, username, context):
         """Try to fetch public profile data using Instagram's public JSON endpoint.
 
         Returns (profile_data_dict, posts_list)
@@ -156,9 +293,9 @@ class InstagramEngagementScraper:
         posts = []
 
         try:
-            # Use Playwright's request API to avoid being blocked by page overlays
+            # Use the context's request API to avoid being blocked by page overlays
             url = f'https://www.instagram.com/{username}/?__a=1&__d=dis'
-            resp = playwright_obj.request.get(url, headers={
+            resp = await context.request.get(url, headers={
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
                 'Accept': 'application/json'
             }, timeout=15000)
@@ -166,7 +303,7 @@ class InstagramEngagementScraper:
             if resp.status != 200:
                 raise Exception(f'HTTP {resp.status}')
 
-            data = resp.json()
+            data = _loads(await resp.body())
 
             # Newer responses include graphql -> user
             user = data.get('graphql', {}).get('user') or data.get('profile')
@@ -176,66 +313,161 @@ class InstagramEngagementScraper:
                 profile['total_posts'] = user.get('edge_owner_to_timeline_media', {}).get('count', 0)
 
                 edges = user.get('edge_owner_to_timeline_media', {}).get('edges', [])
-                for edge in edges[:12]:
-                    node = edge.get('node', {})
-                    likes = node.get('edge_liked_by', {}).get('count', 0)
-                    comments = node.get('edge_media_to_comment', {}).get('count', 0)
-                    posts.append({'likes': likes, 'comments': comments})
+                posts = [
+                    {'likes': node.get('edge_liked_by', {}).get('count', 0),
+                     'comments': node.get('edge_media_to_comment', {}).get('count', 0)}
+                    for node in (edge.get('node', {}) for edge in edges[:12])
+                ]
 
         except Exception as e:
             print(f"Warning: JSON profile fetch failed: {e}")
 
         return profile, posts
     
-    def _extract_posts_data(self, page, max_posts=12):
+    async def _extract_posts_data(self, page, max_posts=12):
         """Extract engagement data from recent posts"""
         
         posts = []
         
         try:
             # Wait for posts to load
-            page.wait_for_selector('article', timeout=10000)
-            time.sleep(2)
+            await page.wait_for_selector('article', timeout=10000)
             
-            # Scroll to load more posts
-            for _ in range(3):
-                page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-                time.sleep(2)
+            # Scroll until enough post links are loaded or a scroll brings in no new ones
+            prev = 0
+            for _ in range(6):
+                await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
+                try:
+                    await page.wait_for_function(
+                        '([sel, n]) => document.querySelectorAll(sel).length > n',
+                        arg=[self._POST_LINK_SEL, prev], timeout=3000
+                    )
+                except Exception:
+                    pass  # Nothing new within 3s
+                cur = await page.locator(self._POST_LINK_SEL).count()
+                if cur >= max_posts or cur == prev:
+                    break
+                prev = cur
             
             # Get all post links
-            post_links = page.locator('article a[href*="/p/"]').all()[:max_posts]
-            
-            print(f"Found {len(post_links)} posts to analyze...")
+            # Plain href strings in one call, not a handle plus a get_attribute per link
+            hrefs = await page.evaluate(
+                '([sel, n]) => Array.from(document.querySelectorAll(sel)).slice(0, n).map(a => a.getAttribute("href"))',
+                [self._POST_LINK_SEL, max_posts]
+            )
             
-            for i, link in enumerate(post_links, 1):
-                try:
-                    href = link.get_attribute('href')
-                    post_url = f"https://www.instagram.com{href}" if href.startswith('/') else href
-                    
-                    print(f"Analyzing post {i}/{len(post_links)}...")
-                    
-                    # Open post in new page
-                    post_page = page.context.new_page()
-                    post_page.goto(post_url, wait_until='networkidle', timeout=20000)
-                    time.sleep(2)
-                    
-                    post_data = self._extract_post_engagement(post_page)
-                    if post_data:
-                        posts.append(post_data)
-                    
-                    post_page.close()
-                    time.sleep(1)  # Be nice to Instagram's servers
-                    
-                except Exception as e:
-                    print(f"Error on post {i}: {str(e)}")
-                    continue
+            print(f"Found {len(hrefs)} posts to analyze...")
+
+            # Open a handful of post pages at once instead of one after another
+            sem = asyncio.Semaphore(self.MAX_PARALLEL_PAGES)
+            tasks = [
+                asyncio.create_task(self._fetch_post(sem, page.context, i, len(hrefs), href))
+                for i, href in enumerate(hrefs, 1)
+            ]
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+
+            for i, result in enumerate(results, 1):
+                if isinstance(result, Exception):
+                    print(f"Error on post {i}: {str(result)}")
+                elif result:
+                    posts.append(result)
         
         except Exception as e:
             print(f"Error extracting posts: {str(e)}")
         
         return posts
+
+    async def _fetch_post_json(self, context, post_url):
+        """Read likes/comments from a post's JSON sibling; None if it is unavailable"""
+        try:
+            resp = await context.request.get(f"{post_url.rstrip('/')}/?__a=1&__d=dis", headers={
+                'Accept': 'application/json'
+            }, timeout=10000)
+            if resp.status != 200:
+                return None
+            data = _loads(await resp.body())
+        except Exception:
+            return None
+        return self._engagement_from_json(data)
+
+    def _engagement_from_json(self, data, shortcode=None):
+        """Pull likes/comments out of any of the post media JSON shapes; None if absent
+        or, when a shortcode is given, if the JSON belongs to another post"""
+        if not isinstance(data, dict):
+            return None
+        media = data.get('graphql', {}).get('shortcode_media')
+        if media:
+            if shortcode and media.get('shortcode') != shortcode:
+                return None
+            return {
+                'likes': media.get('edge_media_preview_like', {}).get('count', 0),
+                'comments': media.get('edge_media_to_parent_comment', {}).get('count', 0)
+            }
+        # Newer responses wrap the media in an items list, GraphQL ones under data
+        items = data.get('items') or (
+            (data.get('data') or {}).get('xdt_api__v1__media__shortcode__web_info') or {}
+        ).get('items') or []
+        if items and 'like_count' in items[0]:
+            if shortcode and items[0].get('code') != shortcode:
+                return None
+            return {'likes': items[0].get('like_count', 0), 'comments': items[0].get('comment_count', 0)}
+        return None
+
+    def _is_media_response(self, response, shortcode):
+        """Match the XHR a post page uses to load this post's own counts"""
+        url = response.url
+        if '/api/v1/media/' in url and '/info/' in url:
+            # The URL only carries the numeric media id; the body is checked for the shortcode
+            return True
+        if '/graphql/query' in url:
+            return shortcode in (response.request.post_data or '')
+        return False
+
+    async def _fetch_post(self, sem, context, i, total, href):
+        """Read one post's engagement, from JSON when possible, else from its own page"""
+        async with sem:
+            post_url = f"https://www.instagram.com{href}" if href.startswith('/') else href
+            
+            print(f"Analyzing post {i}/{total}...")
+
+            # The request shares the context's cookies and needs no page or rendering
+            post_data = await self._fetch_post_json(context, post_url)
+            if post_data:
+                return post_data
+            
+            match = _SHORTCODE_RE.search(post_url)
+            shortcode = match.group(1) if match else ''
+
+            # Open post in new page; the wait starts before goto so the XHR can't be missed
+            post_page = await context.new_page()
+            try:
+                # Leaving the block awaits the response, so a post without a matching
+                # XHR (or a slow goto) raises the timeout here rather than on .value
+                try:
+                    async with post_page.expect_response(
+                        lambda r: self._is_media_response(r, shortcode), timeout=5000
+                    ) as response_info:
+                        await post_page.goto(post_url, wait_until='domcontentloaded', timeout=15000)
+                    response = await response_info.value
+                except PlaywrightTimeout:
+                    response = None
+
+                # The page's own JSON has exact counts; the DOM is only a fallback
+                post_data = None
+                if response is not None:
+                    try:
+                        post_data = self._engagement_from_json(_loads(await response.body()), shortcode)
+                    except Exception:
+                        pass
+                if post_data:
+                    return post_data
+
+                await post_page.wait_for_selector('article', timeout=8000)
+                return await self._extract_post_engagement(post_page)
+            finally:
+                await post_page.close()
     
-    def _extract_post_engagement(self, page):
+    async def _extract_post_engagement(self, page):
         """Extract likes and comments from a single post"""
         
         data = {
@@ -244,56 +476,17 @@ class InstagramEngagementScraper:
         }
         
         try:
-            # Try to find likes
-            like_selectors = [
-                'section span[class*="xdj266r"]',  # Common like counter class
-                'section button span',
-                'a[href*="/liked_by/"] span'
-            ]
-            
-            for selector in like_selectors:
-                try:
-                    elements = page.locator(selector).all()
-                    for elem in elements:
-                        text = elem.inner_text()
-                        if 'like' in text.lower() or re.match(r'^[\d,\.]+[KMB]?\s*$', text):
-                            number = re.search(r'([\d,\.]+[KMB]?)', text)
-                            if number:
-                                data['likes'] = self._convert_to_number(number.group(1))
-                                break
-                    if data['likes'] > 0:
-                        break
-                except:
-                    continue
-            
-            # Try to find comments
-            comment_selectors = [
-                'span:has-text("comment")',
-                'ul li span'
-            ]
-            
-            for selector in comment_selectors:
-                try:
-                    elements = page.locator(selector).all()
-                    for elem in elements:
-                        text = elem.inner_text()
-                        if 'comment' in text.lower():
-                            number = re.search(r'([\d,\.]+[KMB]?)', text)
-                            if number:
-                                data['comments'] = self._convert_to_number(number.group(1))
-                                break
-                    if data['comments'] > 0:
-                        break
-                except:
-                    continue
-            
+            # Walk all candidates inside the page and return only the matching texts
+            stats = await page.evaluate(self._POST_STATS_JS, [self._LIKE_SELECTORS, self._COMMENT_SELECTORS])
+
+            if stats['likes']:
+                data['likes'] = self._convert_to_number(stats['likes'])
+            if stats['comments']:
+                data['comments'] = self._convert_to_number(stats['comments'])
+
             # Fallback: count visible comments
             if data['comments'] == 0:
-                try:
-                    comment_items = page.locator('ul ul li[role="menuitem"]').count()
-                    data['comments'] = comment_items
-                except:
-                    pass
+                data['comments'] = stats['commentItems']
         
         except Exception as e:
             print(f"Error extracting post engagement: {str(e)}")
@@ -311,8 +504,11 @@ class InstagramEngagementScraper:
                 'engagement_rate': 0
             }
         
-        total_likes = sum(p['likes'] for p in posts_data)
-        total_comments = sum(p['comments'] for p in posts_data)
+        # One walk over the posts for both totals
+        total_likes = total_comments = 0
+        for p in posts_data:
+            total_likes += p['likes']
+            total_comments += p['comments']
         num_posts = len(posts_data)
         
         avg_likes = total_likes / num_posts
@@ -332,17 +528,14 @@ class InstagramEngagementScraper:
     def _convert_to_number(self, text):
         """Convert Instagram number format (1.2K, 5M) to integer"""
         text = text.replace(',', '').strip()
-        
-        multipliers = {'K': 1000, 'M': 1000000, 'B': 1000000000}
-        
-        for suffix, multiplier in multipliers.items():
-            if suffix in text.upper():
-                number = float(text.upper().replace(suffix, ''))
-                return int(number * multiplier)
-        
+        if not text:
+            return 0
+
+        # Only the last character can be a suffix
+        multiplier = _MULTIPLIERS.get(text[-1].upper())
         try:
-            return int(float(text))
-        except:
+            return int(float(text[:-1]) * multiplier) if multiplier else int(float(text))
+        except ValueError:
             return 0
     
     def _print_report(self, data):
@@ -377,18 +570,25 @@ class InstagramEngagementScraper:
 # Example usage with CLI arguments
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Instagram engagement scraper (guest/no-login support)')
-    parser.add_argument('--username', '-u', type=str, default='jeromepolin', help='Instagram username to analyze')
+    parser.add_argument('--username', '-u', type=str, default='jeromepolin', help='Instagram username(s) to analyze, comma-separated')
     parser.add_argument('--guest', action='store_true', help='Run in guest mode (no login). Uses public JSON fallback when needed.')
     parser.add_argument('--headless', action='store_true', help='Run browser in headless mode')
+    parser.add_argument('--no-cache', action='store_true', help='Always fetch fresh profile JSON instead of reusing this hour\'s cache')
     args = parser.parse_args()
 
-    scraper = InstagramEngagementScraper(headless=args.headless, guest_mode=args.guest)
+    scraper = InstagramEngagementScraper(headless=args.headless, guest_mode=args.guest, use_cache=not args.no_cache)
 
-    result = scraper.scrape_profile(args.username)
+    usernames = [u.strip() for u in args.username.split(',') if u.strip()]
+    results = scraper.scrape_profiles_sync(usernames)
 
     # Save to JSON
-    if result:
-        filename = f"{args.username}_engagement.json"
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
-        print(f"✅ Data saved to {filename}")
\ No newline at end of file
+    for username, result in zip(usernames, results):
+        if result:
+            filename = f"{username}_engagement.json"
+            if orjson is not None:
+                with open(filename, 'wb') as f:
+                    f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
+            else:
+                with open(filename, 'w', encoding='utf-8') as f:
+                    json.dump(result, f, indent=2, ensure_ascii=False)
+            print(f"✅ Data saved to {filename}")
@@ -1,32 +1,116 @@
 import asyncio
 import json
+import os
 import re
 from datetime import datetime
 from playwright.async_api import async_playwright
 
+try:
+    import orjson
+except ImportError:  # Optional: falls back to stdlib json
+    orjson = None
+
+# Count parsing runs for every video, so the pattern and suffix table are built once
+_COUNT_RE = re.compile(r'([\d.]+)([KMB]?)')
+_MULT = {'K': 1000, 'M': 1000000, 'B': 1000000000}
+
+# Only DOM text is read: skip the heavy assets and analytics hosts
+_BLOCKED_RESOURCE_TYPES = frozenset({'image', 'media', 'font', 'stylesheet'})
+_TRACKER_RE = re.compile(r'google-analytics\.com|googletagmanager\.com|doubleclick\.net|facebook\.com/tr|analytics\.tiktok\.com|mon\.tiktokv\.com')
+
+
+def _dump_json(data, filename):
+    """Write data as indented UTF-8 JSON, with orjson when it is installed"""
+    if orjson is not None:
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+
 class AdvancedTikTokXPathScraper:
-    """Advanced TikTok scraper using XPath selectors"""
+    """Advanced TikTok scraper (originally XPath-based, now CSS data-e2e selectors)"""
     
-    # XPath constants
-    XPATHS = {
-        'username': '//h1[@data-e2e="user-title"]',
-        'subtitle': '//h2[@data-e2e="user-subtitle"]',
-        'bio': '//h2[@data-e2e="user-bio"]',
-        'followers_count': '//strong[@data-e2e="followers-count"]',
-        'following_count': '//strong[@data-e2e="following-count"]',
-        'likes_count': '//strong[@data-e2e="likes-count"]',
-        'verified_badge': '//div[@data-e2e="user-verified-badge"]',
-        'video_items': '//div[@data-e2e="user-post-item"]',
-        'video_views': './/strong[@data-e2e="video-views"]',
-        'video_link': './/a[contains(@href, "/video/")]',
-        # Alternative XPaths for different layouts
-        'followers_alt': '//div[contains(@class, "tiktok-")]//strong[1]',
-        'following_alt': '//div[contains(@class, "tiktok-")]//strong[2]',
-        'likes_alt': '//div[contains(@class, "tiktok-")]//strong[3]',
+    # Selector constants; every target carries a data-e2e attribute, so plain CSS
+    # matches them without going through document.evaluate
+    SELECTORS = {
+        'username': 'h1[data-e2e="user-title"]',
+        'subtitle': 'h2[data-e2e="user-subtitle"]',
+        'bio': 'h2[data-e2e="user-bio"]',
+        'followers_count': 'strong[data-e2e="followers-count"]',
+        'following_count': 'strong[data-e2e="following-count"]',
+        'likes_count': 'strong[data-e2e="likes-count"]',
+        'verified_badge': 'div[data-e2e="user-verified-badge"]',
+        'video_items': 'div[data-e2e="user-post-item"]',
+        'video_views': 'strong[data-e2e="video-views"]',
+        'video_link': 'a[href*="/video/"]',
+        # Alternative selectors for different layouts
+        'followers_alt': 'div[class*="tiktok-"] strong:nth-of-type(1)',
+        'following_alt': 'div[class*="tiktok-"] strong:nth-of-type(2)',
+        'likes_alt': 'div[class*="tiktok-"] strong:nth-of-type(3)',
     }
     
-    def __init__(self, headless=False, timeout=30000):
+    # Profile text fields and verified badge resolved in the page; counts fall back to their *_alt selector
+    PROFILE_FIELDS_JS = """(sel) => {
+        const text = s => {
+            const node = document.querySelector(s);
+            return node ? node.textContent.trim() : '';
+        };
+        return {
+            username: text(sel.username),
+            subtitle: text(sel.subtitle),
+            bio: text(sel.bio),
+            followers: text(sel.followers_count) || text(sel.followers_alt),
+            following: text(sel.following_count) || text(sel.following_alt),
+            likes: text(sel.likes_count) || text(sel.likes_alt),
+            verified: !!document.querySelector(sel.verified_badge),
+        };
+    }"""
+    
+    # Profile fields straight from the embedded hydration JSON, as native ints; null if absent
+    REHYDRATION_PROFILE_JS = """() => {
+        const script = document.getElementById('__UNIVERSAL_DATA_FOR_REHYDRATION__');
+        if (!script) return null;
+        try {
+            const info = JSON.parse(script.textContent).__DEFAULT_SCOPE__['webapp.user-detail'].userInfo;
+            const user = info.user, stats = info.stats;
+            return {
+                username: user.uniqueId || '',
+                subtitle: user.nickname || '',
+                bio: user.signature || '',
+                followers: stats.followerCount || 0,
+                following: stats.followingCount || 0,
+                total_likes: stats.heartCount || stats.heart || 0,
+                verified: !!user.verified,
+            };
+        } catch (e) {
+            return null;
+        }
+    }"""
+    
+    # Run via locator.evaluate_all over the video items: total count plus views/href for the
+    # items from `start` on (the ones not seen yet)
+    VIDEO_ITEMS_JS = """(all, [sel, start]) => {
+        const items = all.slice(start).map(item => {
+            const views = item.querySelector(sel.video_views);
+            const link = item.querySelector(sel.video_link);
+            return {
+                views: views ? views.textContent.trim() : '0',
+                href: link ? link.getAttribute('href') || '' : '',
+            };
+        });
+        return {count: all.length, items};
+    }"""
+    
+    # Cookies and localStorage carried over between runs
+    STATE_FILE = 'tt_state.json'
+    
+    def __init__(self, headless=False, timeout=30000, user_data_dir=None):
+        """user_data_dir: keep a full Chromium profile there (HTTP cache included) instead of STATE_FILE"""
+        self.user_data_dir = user_data_dir
         self.browser = None
+        self.context = None
         self.page = None
         self.playwright = None
         self.headless = headless
@@ -40,83 +124,78 @@ class AdvancedTikTokXPathScraper:
         await self.close()
         
     async def initialize(self):
-        """Initialize browser with XPath support"""
+        """Initialize browser and shared context"""
         self.playwright = await async_playwright().start()
-        self.browser = await self.playwright.chromium.launch(
-            headless=self.headless,
-            args=['--no-sandbox', '--disable-setuid-sandbox']
-        )
-        
-        context = await self.browser.new_context(
-            viewport={'width': 1920, 'height': 1080},
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        )
-        
-        self.page = await context.new_page()
+        launch_args = ['--no-sandbox', '--disable-setuid-sandbox']
+        context_options = {
+            'viewport': {'width': 1920, 'height': 1080},
+            'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+        }
         
-    async def get_element_text(self, xpath, default=''):
-        """Get text from element using XPath"""
-        try:
-            element = await self.page.query_selector(f'xpath={xpath}')
-            if element:
-                return (await element.inner_text()).strip()
-        except Exception as e:
-            print(f'Error getting text for xpath {xpath}: {e}')
-        return default
+        # One context for every profile, so cookies and cached JS bundles carry over
+        if self.user_data_dir:
+            self.context = await self.playwright.chromium.launch_persistent_context(
+                self.user_data_dir, headless=self.headless, args=launch_args, **context_options
+            )
+        else:
+            self.browser = await self.playwright.chromium.launch(headless=self.headless, args=launch_args)
+            if os.path.exists(self.STATE_FILE):
+                context_options['storage_state'] = self.STATE_FILE
+            self.context = await self.browser.new_context(**context_options)
+        await self.context.route('**/*', self._route_request)
+        self.page = await self.new_page()
     
-    async def get_elements(self, xpath):
-        """Get all elements matching XPath"""
-        try:
-            return await self.page.query_selector_all(f'xpath={xpath}')
-        except Exception as e:
-            print(f'Error getting elements for xpath {xpath}: {e}')
-            return []
+    async def new_page(self):
+        """Open another page in the shared context; close it when done"""
+        return await self.context.new_page()
     
-    async def element_exists(self, xpath):
-        """Check if element exists using XPath"""
-        try:
-            element = await self.page.query_selector(f'xpath={xpath}')
-            return element is not None
-        except:
-            return False
+    async def _route_request(self, route):
+        """Abort requests for resources the scraper never reads"""
+        request = route.request
+        if request.resource_type in _BLOCKED_RESOURCE_TYPES or _TRACKER_RE.search(request.url):
+            await route.abort()
+        else:
+            await route.continue_()
+        
     
-    async def parse_count(self, text):
+    def parse_count(self, text):
         """Parse numerical values with K/M/B suffixes"""
         if not text:
             return 0
         
-        text = str(text).strip().upper().replace(',', '')
-        multipliers = {'K': 1000, 'M': 1000000, 'B': 1000000000}
-        
-        match = re.search(r'([\d.]+)([KMB]?)', text)
+        match = _COUNT_RE.search(str(text).strip().upper().replace(',', ''))
         if not match:
             return 0
         
-        value = float(match.group(1))
-        suffix = match.group(2)
+        try:
+            value = float(match.group(1))
+        except ValueError:
+            return 0
         
-        return int(value * multipliers.get(suffix, 1))
+        return int(value * _MULT.get(match.group(2), 1))
     
-    async def scrape_profile(self, username, max_videos=30):
-        """Scrape comprehensive profile data using XPath"""
+    async def scrape_profile(self, username, max_videos=30, page=None):
+        """Scrape comprehensive profile data"""
+        page = page or self.page
         url = f'https://www.tiktok.com/@{username}'
         print(f'📱 Scraping: {url}')
         
         try:
-            await self.page.goto(url, wait_until='domcontentloaded', timeout=self.timeout)
+            await page.goto(url, wait_until='domcontentloaded', timeout=self.timeout)
             await asyncio.sleep(3)
             
             # Wait for video items or profile data
             try:
-                await self.page.wait_for_selector(f'xpath={self.XPATHS["video_items"]}', timeout=10000)
+                await page.wait_for_selector(self.SELECTORS['video_items'], timeout=10000)
             except:
                 print('⚠️ Warning: Could not find videos, checking if profile exists...')
             
-            # Extract profile data
-            profile = await self._extract_profile_stats()
-            
-            # Load videos
-            videos = await self._load_videos(max_videos)
+            # Profile stats and video loading only read the DOM and don't depend on each
+            # other, so start the first video read while the profile evaluate is in flight
+            profile, videos = await asyncio.gather(
+                self._extract_profile_stats(page),
+                self._load_videos(max_videos, page)
+            )
             
             # Calculate metrics
             metrics = self._calculate_metrics(profile, videos)
@@ -134,39 +213,34 @@ class AdvancedTikTokXPathScraper:
             print(f'❌ Error: {e}')
             raise
     
-    async def _extract_profile_stats(self):
-        """Extract profile statistics using XPath"""
+    async def _extract_profile_stats(self, page):
+        """Extract profile statistics"""
         print('📊 Extracting profile stats...')
         
-        # Get username
-        username = await self.get_element_text(self.XPATHS['username'])
-        
-        # Get subtitle (unique ID)
-        subtitle = await self.get_element_text(self.XPATHS['subtitle'])
-        
-        # Get bio
-        bio = await self.get_element_text(self.XPATHS['bio'])
-        
-        # Get follower count
-        followers_text = await self.get_element_text(self.XPATHS['followers_count'])
-        if not followers_text:
-            followers_text = await self.get_element_text(self.XPATHS['followers_alt'])
-        followers = await self.parse_count(followers_text)
-        
-        # Get following count
-        following_text = await self.get_element_text(self.XPATHS['following_count'])
-        if not following_text:
-            following_text = await self.get_element_text(self.XPATHS['following_alt'])
-        following = await self.parse_count(following_text)
+        # The page embeds its hydration JSON with exact counts; only scrape the DOM without it
+        try:
+            profile_data = await page.evaluate(self.REHYDRATION_PROFILE_JS)
+        except Exception as e:
+            print(f'Error reading rehydration data: {e}')
+            profile_data = None
+        if profile_data:
+            print(f"✅ Profile stats extracted: {profile_data['followers']:,} followers, {profile_data['total_likes']:,} likes")
+            return profile_data
         
-        # Get total likes
-        likes_text = await self.get_element_text(self.XPATHS['likes_count'])
-        if not likes_text:
-            likes_text = await self.get_element_text(self.XPATHS['likes_alt'])
-        total_likes = await self.parse_count(likes_text)
+        # Read every text field (and its alternate selector) in one round trip
+        try:
+            fields = await page.evaluate(self.PROFILE_FIELDS_JS, self.SELECTORS)
+        except Exception as e:
+            print(f'Error reading profile fields: {e}')
+            fields = {}
+        username = fields.get('username', '')
+        subtitle = fields.get('subtitle', '')
+        bio = fields.get('bio', '')
+        followers = self.parse_count(fields.get('followers'))
+        following = self.parse_count(fields.get('following'))
+        total_likes = self.parse_count(fields.get('likes'))
         
-        # Check verified status
-        verified = await self.element_exists(self.XPATHS['verified_badge'])
+        verified = fields.get('verified', False)
         
         profile_data = {
             'username': username,
@@ -181,8 +255,9 @@ class AdvancedTikTokXPathScraper:
         print(f'✅ Profile stats extracted: {followers:,} followers, {total_likes:,} likes')
         return profile_data
     
-    async def _load_videos(self, max_videos=30):
-        """Load and extract video data using XPath"""
+    async def _load_videos(self, max_videos=30, page=None):
+        """Load and extract video data"""
+        page = page or self.page
         print(f'🎥 Loading up to {max_videos} videos...')
         
         videos = []
@@ -192,38 +267,27 @@ class AdvancedTikTokXPathScraper:
         no_change_count = 0
         
         while len(videos) < max_videos and scroll_attempts < max_scrolls:
-            # Get current video elements
-            video_elements = await self.get_elements(self.XPATHS['video_items'])
-            current_count = len(video_elements)
+            # Views text and link of the video items added since the last pass, in one round trip
+            start = len(videos)
+            try:
+                batch = await page.locator(self.SELECTORS['video_items']).evaluate_all(
+                    self.VIDEO_ITEMS_JS, [self.SELECTORS, start]
+                )
+            except Exception as e:
+                print(f'⚠️ Error extracting videos: {e}')
+                batch = {'count': last_count, 'items': []}
+            current_count = batch['count']
             
-            # Extract video data
-            for idx, video_element in enumerate(video_elements[:max_videos]):
-                if idx >= len(videos):
-                    try:
-                        # Get views using relative XPath
-                        views_text = await self.get_element_text(self.XPATHS['video_views'])
-                        if not views_text:
-                            # Try to get from child element
-                            views_element = await video_element.query_selector(f'xpath={self.XPATHS["video_views"]}')
-                            views_text = await views_element.inner_text() if views_element else '0'
-                        
-                        # Try to get video URL
-                        link_element = await video_element.query_selector(f'xpath={self.XPATHS["video_link"]}')
-                        video_url = await link_element.get_attribute('href') if link_element else ''
-                        
-                        videos.append({
-                            'index': idx + 1,
-                            'views': await self.parse_count(views_text),
-                            'url': video_url if video_url else None
-                        })
-                        
-                    except Exception as e:
-                        print(f'⚠️ Error extracting video {idx + 1}: {e}')
-                        videos.append({
-                            'index': idx + 1,
-                            'views': 0,
-                            'url': None
-                        })
+            for idx, item in enumerate(batch['items'][:max_videos - start], start):
+                videos.append({
+                    'index': idx + 1,
+                    'views': self.parse_count(item['views']),
+                    'url': item['href'] or None
+                })
+            
+            # Enough videos: stop before another scroll and wait
+            if len(videos) >= max_videos:
+                break
             
             # Check if we got new videos
             if current_count == last_count:
@@ -236,18 +300,22 @@ class AdvancedTikTokXPathScraper:
             
             last_count = current_count
             
-            # Scroll
-            await self.page.evaluate('window.scrollBy(0, window.innerHeight)')
-            await asyncio.sleep(1.5)
+            # Scroll, then continue as soon as more items render; a timeout means none arrived
+            # and is counted by the no-change check on the next pass
+            await page.evaluate('window.scrollBy(0, window.innerHeight)')
+            try:
+                await page.wait_for_function(
+                    '([sel, n]) => document.querySelectorAll(sel).length > n',
+                    arg=[self.SELECTORS['video_items'], current_count], timeout=3000
+                )
+            except Exception:
+                pass
             scroll_attempts += 1
             
             print(f'📜 Scroll {scroll_attempts}/{max_scrolls}: {len(videos)} videos loaded')
-            
-            if len(videos) >= max_videos:
-                break
         
         print(f'✅ Loaded {len(videos)} videos')
-        return videos[:max_videos]
+        return videos
     
     def _calculate_metrics(self, profile, videos):
         """Calculate engagement and performance metrics"""
@@ -261,10 +329,22 @@ class AdvancedTikTokXPathScraper:
                 'videos_analyzed': 0
             }
         
-        total_views = sum(v['views'] for v in videos)
+        # Sum, min, max and Welford's running mean/M2 in a single pass over the videos
+        total_views = 0
+        min_views = float('inf')
+        max_views = 0
+        mean = m2 = 0.0
+        for n, v in enumerate(videos, 1):
+            x = v['views']
+            total_views += x
+            if x < min_views:
+                min_views = x
+            if x > max_views:
+                max_views = x
+            delta = x - mean
+            mean += delta / n
+            m2 += delta * (x - mean)
         avg_views = total_views / video_count
-        max_views = max((v['views'] for v in videos), default=0)
-        min_views = min((v['views'] for v in videos), default=0)
         
         # Engagement rate (likes per follower)
         engagement_rate = (total_likes / followers * 100) if followers > 0 else 0
@@ -277,9 +357,8 @@ class AdvancedTikTokXPathScraper:
         
         # Consistency score (how consistent are view counts)
         if video_count > 1:
-            import statistics
-            view_counts = [v['views'] for v in videos]
-            std_dev = statistics.stdev(view_counts)
+            # Sample standard deviation, as statistics.stdev
+            std_dev = (m2 / (video_count - 1)) ** 0.5
             consistency = 100 - min((std_dev / avg_views * 100), 100) if avg_views > 0 else 0
         else:
             consistency = 0
@@ -299,6 +378,14 @@ class AdvancedTikTokXPathScraper:
     
     async def close(self):
         """Cleanup resources"""
+        if self.context and not self.user_data_dir:
+            # A persistent profile saves itself; otherwise keep the session for the next run
+            try:
+                await self.context.storage_state(path=self.STATE_FILE)
+            except Exception as e:
+                print(f'⚠️ Could not save browser state: {e}')
+        if self.context:
+            await self.context.close()
         if self.browser:
             await self.browser.close()
         if self.playwright:
@@ -346,8 +433,7 @@ async def scrape_single_profile(username='charlidamelio'):
         
         # Save to JSON
         filename = f'tiktok_{username}_xpath_analysis.json'
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        _dump_json(data, filename)
         
         print(f'\n💾 Data saved to {filename}')
         print('='*70)
@@ -355,34 +441,43 @@ async def scrape_single_profile(username='charlidamelio'):
         return data
 
 
-async def compare_multiple_profiles(usernames):
+async def compare_multiple_profiles(usernames, concurrency=4):
     """Compare multiple profiles"""
-    results = []
+    sem = asyncio.Semaphore(concurrency)
     
     async with AdvancedTikTokXPathScraper(headless=False) as scraper:
-        for username in usernames:
-            try:
-                print(f'\n{"="*70}')
-                data = await scraper.scrape_profile(username, max_videos=15)
-                results.append(data)
-                
-                profile = data['profile']
-                metrics = data['metrics']
-                
-                print(f"✅ @{username}")
-                print(f"   Followers: {profile['followers']:,}")
-                print(f"   Engagement: {metrics.get('total_engagement_rate', 'N/A')}%")
-                print(f"   Avg Views: {metrics.get('avg_views_per_video', 'N/A'):,}")
-                
-                await asyncio.sleep(5)  # Delay between profiles
-                
-            except Exception as e:
-                print(f"❌ Failed @{username}: {e}")
+        async def bounded_scrape(username):
+            # Each profile gets its own page; self.page is not shared between tasks
+            async with sem:
+                page = await scraper.new_page()
+                try:
+                    data = await scraper.scrape_profile(username, max_videos=15, page=page)
+                finally:
+                    await page.close()
+            return data
+        
+        outcomes = await asyncio.gather(*[bounded_scrape(u) for u in usernames], return_exceptions=True)
+    
+    results = []
+    for username, outcome in zip(usernames, outcomes):
+        if isinstance(outcome, Exception):
+            print(f"❌ Failed @{username}: {outcome}")
+            continue
+        results.append(outcome)
+        
+        profile = outcome['profile']
+        metrics = outcome['metrics']
+        avg_views = metrics.get('avg_views_per_video')
+        
+        print(f'\n{"="*70}')
+        print(f"✅ @{username}")
+        print(f"   Followers: {profile['followers']:,}")
+        print(f"   Engagement: {metrics.get('total_engagement_rate', 'N/A')}%")
+        print(f"   Avg Views: {f'{avg_views:,}' if avg_views is not None else 'N/A'}")
     
     # Save comparison
     filename = 'tiktok_comparison.json'
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
+    _dump_json(results, filename)
     
     print(f'\n💾 Comparison saved to {filename}')
     return results
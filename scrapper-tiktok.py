@@ -31,7 +31,7 @@ class TikTokProfileScraper:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         })
         
-    async def parse_count(self, text):
+    def parse_count(self, text):
         """Parse count with K, M, B suffixes"""
         if not text:
             return 0
@@ -54,7 +54,13 @@ class TikTokProfileScraper:
             url = f'https://www.tiktok.com/@{username}'
             print(f'Scraping profile: {url}')
             
-            await self.page.goto(url, wait_until='networkidle', timeout=30000)
+            # TikTok's analytics pings keep the network busy, so networkidle rarely fires;
+            # wait for the profile header instead
+            await self.page.goto(url, wait_until='domcontentloaded', timeout=15000)
+            try:
+                await self.page.wait_for_selector('[data-e2e="user-title"]', timeout=10000)
+            except PlaywrightTimeout:
+                print('Warning: profile header did not render within 10s')
 
             # Wait for profile data to load with retries and scrolling to mitigate dynamic loading
             # Use an XPath selector for robustness
@@ -111,9 +117,9 @@ class TikTokProfileScraper:
         # Parse the counts
         return {
             'username': profile_data['username'],
-            'followers': await self.parse_count(profile_data['followers_text']),
-            'following': await self.parse_count(profile_data['following_text']),
-            'likes': await self.parse_count(profile_data['likes_text']),
+            'followers': self.parse_count(profile_data['followers_text']),
+            'following': self.parse_count(profile_data['following_text']),
+            'likes': self.parse_count(profile_data['likes_text']),
             'bio': profile_data['bio']
         }
 
@@ -175,7 +181,7 @@ class TikTokProfileScraper:
         parsed_videos = []
         for video in videos:
             parsed_videos.append({
-                'views': await self.parse_count(video['views_text'])
+                'views': self.parse_count(video['views_text'])
             })
         
         return parsed_videos